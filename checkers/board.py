@@ -1,11 +1,37 @@
 import pygame
 from checkers.constants import *
 from checkers.pieces import Piece
+from checkers.zobrist import piece_key, side_key
+from checkers.moves import (RAYS, encode_move, square_index, square_coords, move_from, move_to,
+                            move_promotes, move_captures, captured_squares, squares_in)
 
 class Board:
-    def __init__(self):
+    def __init__(self, pieces=None):
+        """Initial position, or only pieces, an iterable of (row, col, color, king), if given."""
         self.board = []
-        self.create_board()
+        # Running terms kept up to date by move()/remove() so evaluators never scan the board
+        self.hash = 0  # Zobrist hash of the piece placement
+        self.men = {RED: 0, BLUE: 0}
+        self.kings = {RED: 0, BLUE: 0}
+        self.centrality = {RED: 0, BLUE: 0}  # Sum of CENTRALITY weights of each side's pieces
+        self.pieces = {RED: set(), BLUE: set()}  # Squares occupied by each side's men and kings
+        # Draw rule state, updated by make_move()
+        self.position_counts = {}  # position_key -> occurrences since the last irreversible move
+        self.repetition = False
+        self.king_move_plies = 0  # Consecutive plies with only kings moving and no capture
+        self.reduced_material_plies = 0  # Plies played in the current reduced-material ending
+        self.reduced_material_limit = None
+        if pieces is None:
+            self.create_board()
+        else:
+            self.board = [[0] * COLS for _ in range(ROWS)]
+            for row, col, color, king in pieces:
+                piece = Piece(row, col, color)
+                if king:
+                    piece.make_king()
+                self.board[row][col] = piece
+                self._update_terms(piece, row, col, 1)
+            self.reduced_material_limit = self._reduced_material_limit()  # As if the ending had just begun
 
     def draw_squares(self, win):
         win.fill(WHITE)
@@ -23,10 +49,40 @@ class Board:
                     self.board[row].append(Piece(row, col, RED))   # RED starts at rows 6–9
                 else:
                     self.board[row].append(0)
+                    continue
+                self._update_terms(self.board[row][col], row, col, 1)
 
     def get_piece(self, row, col):
         return self.board[row][col]
 
+    def _update_terms(self, piece, row, col, sign):
+        """Add (sign=1) or remove (sign=-1) piece at (row, col) from the running terms."""
+        self.hash ^= piece_key(piece, row, col)
+        if sign > 0:
+            self.pieces[piece.color].add((row, col))
+        else:
+            self.pieces[piece.color].discard((row, col))
+        if piece.king:
+            self.kings[piece.color] += sign
+        else:
+            self.men[piece.color] += sign
+        self.centrality[piece.color] += sign * CENTRALITY[row][col]
+
+    def get_pieces(self, color):
+        """Live pieces of color, without scanning empty squares."""
+        return [self.board[row][col] for row, col in self.pieces[color]]
+
+    def piece_count(self, color):
+        return self.men[color] + self.kings[color]
+
+    def centrality_score(self, color):
+        """Sum of 1 / distance-to-center over the pieces of color."""
+        return self.centrality[color] / CENTRALITY_SCALE
+
+    def position_key(self, turn):
+        """Hash of the position including the side to move."""
+        return self.hash ^ side_key(turn)
+
     def can_capture(self, piece):
         if piece.king:
             directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
@@ -65,112 +121,85 @@ class Board:
 
     def any_piece_can_capture(self, color):
         """Check if any piece of the given color can capture."""
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.get_piece(row, col)
-                if piece != 0 and piece.color == color and self.can_capture(piece):
-                    return True
+        for piece in self.get_pieces(color):
+            if self.can_capture(piece):
+                return True
         return False
 
     def get_max_captures(self, color):
         """Find the maximum number of captures possible for any piece of the given color."""
         max_captures = 0
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.get_piece(row, col)
-                if piece != 0 and piece.color == color:
-                    sequences = self._get_all_capture_sequences(piece, piece.row, piece.col, set(), set())
-                    if sequences:
-                        max_captures = max(max_captures, max(len(seq[1]) for seq in sequences))
+        for piece in self.get_pieces(color):
+            sequences = self.capture_sequences(piece)
+            if sequences:
+                max_captures = max(max_captures, sequences[0][1].bit_count())
         return max_captures
 
+    def legal_moves(self, color):
+        """Return every legal move of color as an encoded int (see checkers/moves.py).
+
+        When any capture exists only the maximum captures are legal; sequences with
+        the same destination and captured pieces are a single move.
+        """
+        captures = []
+        max_captures = 0
+        for piece in self.get_pieces(color):
+            if not self.can_capture(piece):
+                continue
+            sequences = self.capture_sequences(piece)
+            count = sequences[0][1].bit_count() if sequences else 0
+            if count > max_captures:
+                max_captures = count
+                captures = []
+            if count and count == max_captures:
+                captures.extend((piece, dest, captured) for dest, captured, _ in sequences)
+        if captures:
+            moves = []
+            for piece, dest, captured in captures:
+                promotion = not piece.king and square_coords(dest)[0] == (ROWS - 1 if piece.color == BLUE else 0)
+                moves.append(encode_move(square_index(piece.row, piece.col), dest, captured, promotion))
+            return moves
+
+        moves = []
+        for piece in self.get_pieces(color):
+            for dest_row, dest_col in self._simple_moves(piece):
+                moves.append(self._encode_move(piece, dest_row, dest_col, []))
+        return moves
+
     def valid_move(self, piece, dest_row, dest_col):
         valid_moves = self.get_valid_moves(piece)
         if (dest_row, dest_col) in valid_moves:
             captured = []
             visited = [(dest_row, dest_col)]  # List to store path
             if self.any_piece_can_capture(piece.color):
-                _, captured, visited = self._check_capture_path(
-                    piece, piece.row, piece.col, dest_row, dest_col, [], [])
+                dest = square_index(dest_row, dest_col)
+                max_captures = self.get_max_captures(piece.color)
+                for seq_dest, captured_mask, path in self.capture_sequences(piece):
+                    if seq_dest == dest and captured_mask.bit_count() == max_captures:
+                        captured = [square_coords(sq) for sq in squares_in(captured_mask)]
+                        visited = [square_coords(sq) for sq in path]
+                        break
             return True, captured, visited
         return False, [], []
 
-    def _check_capture_path(self, piece, current_row, current_col, dest_row, dest_col, captured_pieces, visited):
-        if current_row == dest_row and current_col == dest_col:
-            return len(captured_pieces) > 0, captured_pieces, visited + [(current_row, current_col)]
-
-        if piece.king:
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        else:
-            directions = [(-2, -2), (-2, 2), (2, -2), (2, 2)]
-
-        for dr, dc in directions:
-            if piece.king:
-                new_row = current_row + dr
-                new_col = current_col + dc
-                while 0 <= new_row < ROWS and 0 <= new_col < COLS:
-                    current_piece = self.get_piece(new_row, new_col)
-                    if current_piece == 0:
-                        new_row += dr
-                        new_col += dc
-                        continue
-                    if current_piece.color == piece.color:
-                        break
-                    if (new_row, new_col) not in captured_pieces:
-                        next_row = new_row + dr
-                        next_col = new_col + dc
-                        while 0 <= next_row < ROWS and 0 <= next_col < COLS:
-                            if self.get_piece(next_row, next_col) != 0:
-                                break
-                            if (next_row, next_col) not in visited:
-                                new_captured = captured_pieces + [(new_row, new_col)]
-                                new_visited = visited + [(next_row, next_col)]
-                                result, final_captured, final_visited = self._check_capture_path(
-                                    piece, next_row, next_col, dest_row, dest_col,
-                                    new_captured, new_visited)
-                                if result:
-                                    return True, final_captured, final_visited
-                            next_row += dr
-                            next_col += dc
-                    break
-            else:
-                new_row = current_row + dr
-                new_col = current_col + dc
-                if not (0 <= new_row < ROWS and 0 <= new_col < COLS):
-                    continue
-                mid_row = current_row + dr//2
-                mid_col = current_col + dc//2
-                if self.get_piece(new_row, new_col) != 0:
-                    continue
-                piece_to_capture = self.get_piece(mid_row, mid_col)
-                if (piece_to_capture == 0 or 
-                    piece_to_capture.color == piece.color or 
-                    piece_to_capture.king or  # Regular pawn cannot capture king
-                    (mid_row, mid_col) in captured_pieces):
-                    continue
-                new_captured = captured_pieces + [(mid_row, mid_col)]
-                new_visited = visited + [(new_row, new_col)]
-                result, final_captured, final_visited = self._check_capture_path(
-                    piece, new_row, new_col, dest_row, dest_col, new_captured, new_visited)
-                if result:
-                    return True, final_captured, final_visited
-        return False, captured_pieces, visited
-
     def get_valid_moves(self, piece):
         if self.any_piece_can_capture(piece.color):
             if not self.can_capture(piece):
                 return set()  # Block moves for pieces that cannot capture
             # Get all capture sequences and filter for maximum captures
-            sequences = self._get_all_capture_sequences(piece, piece.row, piece.col, set(), set())
+            sequences = self.capture_sequences(piece)
             if not sequences:
                 return set()
             max_captures = self.get_max_captures(piece.color)
             valid_moves = set()
             for dest, captured, _ in sequences:
-                if len(captured) == max_captures:
-                    valid_moves.add(dest)
+                if captured.bit_count() == max_captures:
+                    valid_moves.add(square_coords(dest))
             return valid_moves
         # No captures available, allow simple moves
+        return self._simple_moves(piece)
+
+    def _simple_moves(self, piece):
         valid_moves = set()
         if piece.king:
             directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
@@ -192,54 +221,70 @@ class Board:
                     valid_moves.add((row, col))
         return valid_moves
 
-    def _get_all_capture_sequences(self, piece, row, col, captured, visited):
-        """Return list of (destination, captured_pieces, visited_squares) for all capture sequences."""
-        sequences = []
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        found_capture = False
+    def capture_sequences(self, piece):
+        """Return [(dest, captured_mask, path)] for the longest capture sequences of piece.
 
-        for dr, dc in directions:
-            if piece.king:
-                r, c = row + dr, col + dc
-                while 0 <= r < ROWS and 0 <= c < COLS and self.get_piece(r, c) == 0:
-                    r += dr
-                    c += dc
-                if 0 <= r < ROWS and 0 <= c < COLS:
-                    mid = self.get_piece(r, c)
-                    if mid != 0 and mid.color != piece.color and (r, c) not in captured:
-                        jump_r, jump_c = r + dr, c + dc
-                        while 0 <= jump_r < ROWS and 0 <= jump_c < COLS and self.get_piece(jump_r, jump_c) == 0:
-                            if (jump_r, jump_c) not in visited:
-                                new_captured = captured | {(r, c)}
-                                new_visited = visited | {(jump_r, jump_c)}
-                                further_sequences = self._get_all_capture_sequences(
-                                    piece, jump_r, jump_c, new_captured, new_visited)
-                                if further_sequences:
-                                    sequences.extend(further_sequences)
-                                else:
-                                    sequences.append(((jump_r, jump_c), new_captured, new_visited))
-                                found_capture = True
-                            jump_r += dr
-                            jump_c += dc
-            else:
-                mid_r, mid_c = row + dr, col + dc
-                jump_r, jump_c = row + 2 * dr, col + 2 * dc
-                if 0 <= mid_r < ROWS and 0 <= mid_c < COLS and 0 <= jump_r < ROWS and 0 <= jump_c < COLS:
-                    mid = self.get_piece(mid_r, mid_c)
-                    if (mid != 0 and mid.color != piece.color and not mid.king and  # Regular pawn cannot capture king
-                        (mid_r, mid_c) not in captured):
-                        if self.get_piece(jump_r, jump_c) == 0 and (jump_r, jump_c) not in visited:
-                            new_captured = captured | {(mid_r, mid_c)}
-                            new_visited = visited | {(jump_r, jump_c)}
-                            further_sequences = self._get_all_capture_sequences(
-                                piece, jump_r, jump_c, new_captured, new_visited)
-                            if further_sequences:
-                                sequences.extend(further_sequences)
-                            else:
-                                sequences.append(((jump_r, jump_c), new_captured, new_visited))
-                            found_capture = True
-
-        return sequences
+        Squares are numbered as in checkers/moves.py and path lists the landing squares.
+        The search runs on an explicit stack with bitmask state; sequences that end on
+        the same square having captured the same pieces are returned once. Captured
+        pieces stay on the board until the move is made, and a piece cannot land on the
+        same square twice.
+        """
+        board = self.board
+        color = piece.color
+        king = piece.king
+        best = 0
+        outcomes = {}  # (dest, captured_mask) -> path
+        seen = set()  # (square, captured_mask, visited_mask) states already queued
+        stack = [(square_index(piece.row, piece.col), 0, 0, ())]
+
+        while stack:
+            square, captured, visited, path = stack.pop()
+            extended = False
+            for ray in RAYS[square]:
+                if king:
+                    # Flying king: slide to the first occupied square, jump it, land on any empty square behind
+                    i = 0
+                    while i < len(ray) and board[ray[i][0]][ray[i][1]] == 0:
+                        i += 1
+                    if i >= len(ray) - 1:
+                        continue
+                    row, col, target = ray[i]
+                    target_bit = 1 << target
+                    if board[row][col].color == color or captured & target_bit:
+                        continue
+                    landings = ray[i + 1:]
+                else:
+                    if len(ray) < 2:
+                        continue
+                    row, col, target = ray[0]
+                    target_bit = 1 << target
+                    mid = board[row][col]
+                    if mid == 0 or mid.color == color or mid.king or captured & target_bit:  # Regular pawn cannot capture king
+                        continue
+                    landings = ray[1:2]
+
+                for land_row, land_col, land in landings:
+                    if board[land_row][land_col] != 0:
+                        break
+                    land_bit = 1 << land
+                    if visited & land_bit:
+                        continue
+                    extended = True
+                    state = (land, captured | target_bit, visited | land_bit)
+                    if state not in seen:
+                        seen.add(state)
+                        stack.append(state + (path + (land,),))
+
+            if not extended and captured:
+                count = captured.bit_count()
+                if count > best:
+                    best = count
+                    outcomes = {}
+                if count == best and (square, captured) not in outcomes:
+                    outcomes[(square, captured)] = path
+
+        return [(dest, captured, path) for (dest, captured), path in outcomes.items()]
 
     def _can_capture_from(self, piece, row, col, captured):
         directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
@@ -289,73 +334,98 @@ class Board:
                                15)
 
     def move(self, piece, dest_row, dest_col):
-        valid, captured_pieces, visited = self.valid_move(piece, dest_row, dest_col)
+        valid, captured_pieces, _ = self.valid_move(piece, dest_row, dest_col)
         
         if valid:
-            pieces_to_remove = []
-            for mid_row, mid_col in captured_pieces:
-                piece_to_remove = self.get_piece(mid_row, mid_col)
-                if piece_to_remove != 0:
-                    pieces_to_remove.append(piece_to_remove)
-            
-            self.remove(pieces_to_remove)
-
-            # Move through the capture path if it's a capture move
-            if captured_pieces:
-                for row, col in visited[:-1]:  # Exclude final destination
-                    self.board[piece.row][piece.col] = 0
-                    self.board[row][col] = piece
-                    piece.move(row, col)
-                # Final move
-                self.board[piece.row][piece.col] = 0
-                self.board[dest_row][dest_col] = piece
-                piece.move(dest_row, dest_col)
-            else:
-                # Non-capture move
-                self.board[piece.row][piece.col] = 0
-                self.board[dest_row][dest_col] = piece
-                piece.move(dest_row, dest_col)
-
-            if not piece.king:
-                if (piece.color == BLUE and dest_row == ROWS - 1) or (piece.color == RED and dest_row == 0):
-                    piece.make_king()
-
+            self.make_move(self._encode_move(piece, dest_row, dest_col, captured_pieces))
             return True  # Turn ends after move
         return False
 
+    def _encode_move(self, piece, dest_row, dest_col, captured_pieces):
+        captured_mask = 0
+        for row, col in captured_pieces:
+            captured_mask |= 1 << square_index(row, col)
+        promotion = not piece.king and dest_row == (ROWS - 1 if piece.color == BLUE else 0)
+        return encode_move(square_index(piece.row, piece.col), square_index(dest_row, dest_col),
+                           captured_mask, promotion)
+
+    def make_move(self, move):
+        """Apply an encoded move as returned by legal_moves()."""
+        from_row, from_col = square_coords(move_from(move))
+        dest_row, dest_col = square_coords(move_to(move))
+        piece = self.board[from_row][from_col]
+
+        self.remove([self.get_piece(row, col) for row, col in map(square_coords, captured_squares(move))])
+        self._update_terms(piece, from_row, from_col, -1)
+        self.board[from_row][from_col] = 0
+        self.board[dest_row][dest_col] = piece
+        piece.move(dest_row, dest_col)
+        reversible = piece.king and not move_captures(move)
+        if move_promotes(move):
+            piece.make_king()
+        self._update_terms(piece, dest_row, dest_col, 1)
+        self._update_draw_state(reversible, BLUE if piece.color == RED else RED)
+        return True
+
+    def _update_draw_state(self, reversible, turn):
+        if reversible:
+            self.king_move_plies += 1
+        else:
+            # Men never move back and captured pieces never return: earlier positions cannot repeat
+            self.king_move_plies = 0
+            self.position_counts.clear()
+        key = self.position_key(turn)
+        count = self.position_counts.get(key, 0) + 1
+        self.position_counts[key] = count
+        if count >= REPETITION_DRAW_COUNT:
+            self.repetition = True
+
+        limit = self._reduced_material_limit()
+        if limit != self.reduced_material_limit:
+            self.reduced_material_limit = limit
+            self.reduced_material_plies = 0
+        elif limit is not None:
+            self.reduced_material_plies += 1
+
+    def _reduced_material_limit(self):
+        for strong, weak in ((RED, BLUE), (BLUE, RED)):
+            if self.men[weak] == 0 and self.kings[weak] == 1:
+                return REDUCED_MATERIAL_DRAW_PLIES.get((self.men[strong], self.kings[strong]))
+        return None
+
+    def draw_reason(self):
+        """Name of the draw rule that ends the game, or None."""
+        if self.repetition:
+            return 'threefold repetition'
+        if self.king_move_plies >= KING_MOVES_DRAW_PLIES:
+            return '25 king moves without a capture or man move'
+        if self.reduced_material_limit is not None and self.reduced_material_plies >= self.reduced_material_limit:
+            return f'{self.reduced_material_limit // 2} moves in a reduced-material ending'
+        return None
+
+    def is_draw(self):
+        return self.draw_reason() is not None
+
     def remove(self, pieces):
         for piece in pieces:
+            self._update_terms(piece, piece.row, piece.col, -1)
             self.board[piece.row][piece.col] = 0
 
     def can_move(self, piece):
         return bool(self.get_valid_moves(piece))
 
-    def get_winner(self):
-        red_pieces = 0
-        blue_pieces = 0
-        red_can_move = False
-        blue_can_move = False
+    def has_moves(self, color):
+        # A side that can capture always has a legal (maximum) capture
+        return any(self.can_capture(piece) or self._simple_moves(piece) for piece in self.get_pieces(color))
 
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.get_piece(row, col)
-                if piece != 0:
-                    if piece.color == RED:
-                        red_pieces += 1
-                        if not red_can_move and self.can_move(piece):
-                            red_can_move = True
-                    else:
-                        blue_pieces += 1
-                        if not blue_can_move and self.can_move(piece):
-                            blue_can_move = True
-
-        if red_pieces == 0:
+    def get_winner(self):
+        if self.piece_count(RED) == 0:
             return BLUE
-        elif blue_pieces == 0:
+        elif self.piece_count(BLUE) == 0:
             return RED
-        elif not red_can_move:
+        elif not self.has_moves(RED):
             return BLUE
-        elif not blue_can_move:
+        elif not self.has_moves(BLUE):
             return RED
         return None
 
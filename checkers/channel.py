@@ -0,0 +1,80 @@
+import asyncio
+import queue
+import threading
+
+
+class GameChannel:
+    """Event-driven handoff between the engine thread and the GUI.
+
+    The engine publishes immutable Snapshots and the GUI reads the latest one;
+    the GUI sends human moves back as encoded ints. Neither side shares the
+    engine's Board. notify is called after every publish (main() uses it to
+    post a pygame event so the GUI wakes up instead of polling); likewise
+    send_move() wakes an engine awaiting next_move() on its event loop.
+    """
+    def __init__(self, notify=None):
+        self.notify = notify
+        self._latest = None
+        self._moves = queue.Queue()
+        self.published = threading.Event()
+        self.closed = False
+        self._waiter = None  # (loop, asyncio.Event) of a pending next_move()
+
+    def publish(self, snapshot):
+        self._latest = snapshot  # A single reference swap; readers never see a half-updated position
+        self.published.set()
+        if self.notify:
+            self.notify()
+
+    def latest(self):
+        return self._latest
+
+    def wait_snapshot(self, timeout=None):
+        """Block until something new is published; returns the latest snapshot."""
+        self.published.wait(timeout)
+        self.published.clear()
+        return self._latest
+
+    def close(self):
+        """Called by the engine when the game is over."""
+        self.closed = True
+        self.published.set()
+        if self.notify:
+            self.notify()
+
+    def send_move(self, ply, move):
+        """Send a move for the position published at ply; moves for older positions are dropped."""
+        self._moves.put((ply, move))
+        self.wake()
+
+    def wake(self):
+        """Resume a pending next_move(), from any thread; it returns None if no move was sent."""
+        waiter = self._waiter
+        if waiter is not None:
+            loop, ready = waiter
+            loop.call_soon_threadsafe(ready.set)
+
+    def wait_move(self, timeout=None):
+        """Next (ply, move) sent by the GUI; raises queue.Empty after timeout seconds."""
+        return self._moves.get(timeout=timeout)
+
+    def poll_move(self):
+        """Next (ply, move) sent by the GUI, or None if there is none yet."""
+        try:
+            return self._moves.get_nowait()
+        except queue.Empty:
+            return None
+
+    async def next_move(self):
+        """Await the next (ply, move) sent by the GUI; None if wake() was called without a move."""
+        ready = asyncio.Event()
+        self._waiter = (asyncio.get_running_loop(), ready)
+        try:
+            # Checked after the waiter is in place, so a move sent in between still wakes us
+            received = self.poll_move()
+            if received is None:
+                await ready.wait()
+                received = self.poll_move()
+            return received
+        finally:
+            self._waiter = None
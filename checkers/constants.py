@@ -10,3 +10,23 @@ GREY = (128, 128, 128)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
+
+# Evaluation terms
+CENTER_SQUARES = [(4, 4), (4, 5), (5, 4), (5, 5)]  # 10x10 board centers
+# Centrality of a square is 1 / max(distance to nearest center, 1). Weights are stored
+# scaled by CENTRALITY_SCALE (lcm of the possible distances) so running sums stay exact.
+CENTRALITY_SCALE = 840
+CENTRALITY = [
+    [CENTRALITY_SCALE // max(min(abs(row - cr) + abs(col - cc) for cr, cc in CENTER_SQUARES), 1)
+     for col in range(COLS)]
+    for row in range(ROWS)
+]
+
+# Draw rules (FMJD), counted in plies
+REPETITION_DRAW_COUNT = 3  # Same position with the same side to move
+KING_MOVES_DRAW_PLIES = 50  # 25 moves each with only kings moving and no capture
+# (men, kings) of the stronger side against a lone king -> plies until the game is drawn
+REDUCED_MATERIAL_DRAW_PLIES = {
+    (0, 3): 32, (1, 2): 32, (2, 1): 32,  # 16 moves each
+    (0, 2): 10, (1, 1): 10, (0, 1): 10,  # 5 moves each
+}
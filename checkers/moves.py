@@ -0,0 +1,90 @@
+# moves.py
+from checkers.constants import ROWS, COLS
+
+# Moves are plain ints, independent of any Board or Piece object:
+#   bits 0-5   from square (0-49, dark squares numbered row by row from the top)
+#   bits 6-11  to square
+#   bit 12     promotion flag
+#   bits 13+   bitmask of captured squares
+SQUARES = ROWS * COLS // 2
+SQUARE_BITS = 6
+SQUARE_MASK = (1 << SQUARE_BITS) - 1
+PROMOTION_BIT = 1 << 12
+CAPTURE_SHIFT = 13
+
+
+def square_index(row, col):
+    return row * (COLS // 2) + col // 2
+
+
+def square_coords(square):
+    row = square // (COLS // 2)
+    col = 2 * (square % (COLS // 2)) + (1 - row % 2)
+    return row, col
+
+
+def encode_move(from_square, to_square, captured_mask=0, promotion=False):
+    move = from_square | (to_square << SQUARE_BITS) | (captured_mask << CAPTURE_SHIFT)
+    return move | PROMOTION_BIT if promotion else move
+
+
+def move_from(move):
+    return move & SQUARE_MASK
+
+
+def move_to(move):
+    return (move >> SQUARE_BITS) & SQUARE_MASK
+
+
+def move_promotes(move):
+    return bool(move & PROMOTION_BIT)
+
+
+def move_captures(move):
+    """Bitmask of captured squares."""
+    return move >> CAPTURE_SHIFT
+
+
+def capture_count(move):
+    return (move >> CAPTURE_SHIFT).bit_count()
+
+
+def squares_in(mask):
+    """Square numbers of the set bits of mask, lowest first."""
+    squares = []
+    while mask:
+        low = mask & -mask
+        squares.append(low.bit_length() - 1)
+        mask ^= low
+    return squares
+
+
+def captured_squares(move):
+    return squares_in(move >> CAPTURE_SHIFT)
+
+
+def move_coords(move):
+    """(from_row, from_col, to_row, to_col) of move."""
+    return square_coords(move_from(move)) + square_coords(move_to(move))
+
+
+def move_to_str(move):
+    """Standard draughts notation with squares numbered 1-50, e.g. '32-28' or '19x30'."""
+    separator = 'x' if move_captures(move) else '-'
+    return f"{move_from(move) + 1}{separator}{move_to(move) + 1}"
+
+
+def _ray(square, dr, dc):
+    row, col = square_coords(square)
+    ray = []
+    row, col = row + dr, col + dc
+    while 0 <= row < ROWS and 0 <= col < COLS:
+        ray.append((row, col, square_index(row, col)))
+        row, col = row + dr, col + dc
+    return tuple(ray)
+
+
+# RAYS[square] holds, for each diagonal direction, the (row, col, square) cells
+# walked outward from square, nearest first
+RAYS = [tuple(_ray(square, dr, dc) for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1)))
+        for square in range(SQUARES)]
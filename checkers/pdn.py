@@ -0,0 +1,256 @@
+"""PDN (Portable Draughts Notation) game archives.
+
+Games are appended to a plain-text archive as they are played: the tags when
+a game starts, each move when it is made, then the result. A crash leaves a
+game without a result, which the reader returns as unfinished ("*").
+
+    [Event "AI vs AI"]
+    [White "MCTS"]
+    [Black "Material Heuristic MCTS"]
+    [GameType "20"]
+    [Result "*"]
+
+    1... 18-23 2. 33-28 23x32 3. 37x28 ...
+    {[Termination "threefold repetition"] [WhiteSeconds "12.4"]} 1-1
+
+White is RED and Black is BLUE, as in checkers/position.py. A position other
+than the initial one is given by a FEN tag. The result is only known at the
+end, so the Result tag stays "*". The final result token and the tags in the
+comment just before it complete the header; the reader merges them in.
+A capture whose notation matches more than one legal move (king captures
+with the same start and end squares) is followed by a {x..} comment listing
+the captured squares.
+
+read_games() streams an archive one game at a time, and PdnGame.positions()
+and read_positions() replay games lazily, so archives of any size can be scanned.
+"""
+import copy
+import datetime
+import io
+import re
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from checkers.moves import move_to_str, move_captures, captured_squares
+from checkers.position import from_fen, to_fen
+
+RESULTS = {RED: '2-0', BLUE: '0-2', None: '1-1'}  # Winner -> result token; None is a draw
+UNFINISHED = '*'
+_RESULT_TOKENS = {'2-0', '0-2', '1-1', '1-0', '0-1', UNFINISHED}
+_LINE_LENGTH = 80
+_TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_TOKEN = re.compile(r'\{[^}]*\}|[^\s{]+')
+_MOVE = re.compile(r'^\d+(?:[-x]\d+)+$')  # Intermediate squares of a capture path are skipped
+_MOVE_NUMBER = re.compile(r'^\d+\.+$')
+
+
+def _quote(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _unquote(value):
+    return re.sub(r'\\(.)', r'\1', value)
+
+
+def _tags_text(tags):
+    return ''.join(f'[{name} "{_quote(value)}"]' for name, value in tags.items())
+
+
+class GameRecord:
+    """One game being written to an open text file, a move at a time."""
+    def __init__(self, file, tags, board=None, turn=BLUE, close=False):
+        self.file = file
+        self.close = close  # Close file when the game is finished
+        self.turn = turn
+        self.number = 1
+        self.line_length = 0
+        self.finished = False
+        header = {'Date': datetime.date.today().strftime('%Y.%m.%d'), **tags, 'GameType': '20', 'Result': UNFINISHED}
+        if board is not None or turn != BLUE:
+            header['FEN'] = to_fen(board or Board(), turn)
+        file.write(''.join(f'[{name} "{_quote(value)}"]\n' for name, value in header.items()) + '\n')
+        file.flush()
+
+    def add_move(self, move, board=None):
+        """Write move; board (before the move) lets a capture with ambiguous notation be disambiguated."""
+        tokens = []
+        if self.turn == RED:
+            tokens.append(f'{self.number}.')
+        elif self.number == 1 and self.line_length == 0:
+            tokens.append('1...')  # BLUE moves first
+        notation = move_to_str(move)
+        tokens.append(notation)
+        if (board is not None and move_captures(move)
+                and sum(move_to_str(m) == notation for m in board.legal_moves(self.turn)) > 1):
+            tokens.append('{x' + ','.join(str(square + 1) for square in captured_squares(move)) + '}')
+        if self.turn == BLUE:
+            self.number += 1
+        self.turn = BLUE if self.turn == RED else RED
+        self._write(tokens)
+
+    def finish(self, winner=None, result=None, tags=None):
+        """Write the result (from winner, or an explicit result token) and any final tags; closes the game."""
+        if self.finished:
+            return
+        tokens = ['{' + _tags_text(tags) + '}'] if tags else []
+        tokens.append(result or RESULTS[winner])
+        self._write(tokens)
+        self.file.write('\n\n')
+        self.file.flush()
+        self.finished = True
+        if self.close:
+            self.file.close()
+
+    def _write(self, tokens):
+        text = ' '.join(tokens)
+        if self.line_length and self.line_length + 1 + len(text) > _LINE_LENGTH:
+            self.file.write('\n')
+            self.line_length = 0
+        elif self.line_length:
+            text = ' ' + text
+        self.file.write(text)
+        self.line_length += len(text)
+        self.file.flush()
+
+
+class PdnArchive:
+    """Append-only archive file. Use one writer per file; parallel runs should use write_game()."""
+    def __init__(self, path):
+        self.path = path
+
+    def start_game(self, tags, board=None, turn=BLUE):
+        """Open a GameRecord appending to the archive; board is only needed for a non-initial position."""
+        return GameRecord(self._open(), tags, board, turn, close=True)
+
+    def write_game(self, tags, moves, winner=None, result=None, final_tags=None, board=None, turn=BLUE):
+        """Append a whole game with a single write, so concurrent writers never interleave."""
+        buffer = io.StringIO()
+        record = GameRecord(buffer, tags, board, turn)
+        replay = copy.deepcopy(board) if board is not None else Board()
+        for move in moves:
+            record.add_move(move, replay)
+            replay.make_move(move)
+        record.finish(winner, result, final_tags)
+        with self._open() as f:
+            f.write(buffer.getvalue())
+
+    def _open(self):
+        f = open(self.path, 'a+', encoding='utf-8')
+        if f.tell():
+            f.seek(f.tell() - 1)
+            if f.read(1) != '\n':
+                f.write('\n\n')  # After a game cut off by a crash
+        return f
+
+
+class PdnGame:
+    def __init__(self, tags, moves, result):
+        self.tags = tags  # Header tags merged with the final-comment tags; Result is the final result
+        self.moves = moves  # (notation, captured squares or None) as written
+        self.result = result
+
+    @property
+    def winner(self):
+        """RED, BLUE, None for a draw; raises ValueError for an unfinished game."""
+        if self.result in ('2-0', '1-0'):
+            return RED
+        if self.result in ('0-2', '0-1'):
+            return BLUE
+        if self.result == '1-1':
+            return None
+        raise ValueError('unfinished game')
+
+    def positions(self):
+        """Yield (board, turn, move) before every move, replaying the game on one Board updated in place."""
+        if 'FEN' in self.tags:
+            board, turn = from_fen(self.tags['FEN'])
+        else:
+            board, turn = Board(), BLUE
+        for notation, captured in self.moves:
+            move = _parse_move(notation, captured, board.legal_moves(turn))
+            yield board, turn, move
+            board.make_move(move)
+            turn = BLUE if turn == RED else RED
+
+    def encoded_moves(self):
+        return [move for _, _, move in self.positions()]
+
+
+def _parse_move(notation, captured, legal_moves):
+    matches = [move for move in legal_moves if move_to_str(move) == notation]
+    if captured is not None:
+        matches = [move for move in matches if sorted(captured_squares(move)) == captured]
+    if not matches:
+        raise ValueError(f'illegal move {notation!r} in PDN')
+    return matches[0]
+
+
+def read_games(path):
+    """Yield the games of an archive one at a time."""
+    with open(path, encoding='utf-8') as f:
+        yield from parse_games(f)
+
+
+def read_positions(path):
+    """Yield (game, board, turn, move) for every move of every game in an archive; see PdnGame.positions()."""
+    for game in read_games(path):
+        for board, turn, move in game.positions():
+            yield game, board, turn, move
+
+
+def parse_games(lines):
+    """Yield PdnGame objects from an iterable of PDN text lines."""
+    tags = {}
+    moves = []
+    comment = None  # Text of the last comment, if it came after the last move
+    pending = ''  # A comment spanning lines
+    in_movetext = False
+    header_closed = False  # A blank line followed the tags
+
+    def game(result):
+        final = dict(_TAG.findall(comment)) if comment else {}
+        merged = {name: _unquote(value) for name, value in {**tags, **final}.items()}
+        merged['Result'] = result
+        return PdnGame(merged, moves, result)
+
+    for line in lines:
+        if pending:
+            line = pending + ' ' + line
+            pending = ''
+        stripped = line.strip()
+        if not stripped:
+            header_closed = bool(tags) and not in_movetext
+            continue
+        if stripped.startswith('[') and not pending:
+            found = _TAG.findall(stripped)
+            if in_movetext or header_closed or any(name in tags for name, _ in found):
+                yield game(UNFINISHED)  # The previous game was cut off, possibly before its first move
+                tags, moves, comment, in_movetext, header_closed = {}, [], None, False, False
+            for name, value in found:
+                tags[name] = value
+            continue
+        if stripped.count('{') > stripped.count('}'):
+            pending = stripped
+            continue
+        in_movetext = True
+        for token in _TOKEN.findall(stripped):
+            if token.startswith('{'):
+                body = token[1:-1].strip()
+                if moves and body.startswith('x') and comment is None:
+                    moves[-1] = (moves[-1][0], sorted(int(s) - 1 for s in body[1:].split(',')))
+                else:
+                    comment = body
+            elif token in _RESULT_TOKENS:
+                yield game(token)
+                tags, moves, comment, in_movetext, header_closed = {}, [], None, False, False
+            elif _MOVE_NUMBER.match(token):
+                continue
+            else:
+                token = token.rsplit('.', 1)[-1]  # "12.32-28"
+                if not _MOVE.match(token):
+                    raise ValueError(f'unexpected token {token!r} in PDN')
+                squares = re.split('[-x]', token)
+                separator = 'x' if 'x' in token else '-'
+                moves.append((f'{int(squares[0])}{separator}{int(squares[-1])}', None))
+                comment = None
+    if in_movetext or moves or tags:
+        yield game(UNFINISHED)
@@ -0,0 +1,141 @@
+"""Position serialization: FEN text, a fixed 20-byte binary form and a content hash.
+
+Positions are piece placement plus side to move; draw-rule history is not part
+of them. Use them for IPC, persistent keys, game logs and fixtures instead of
+pickling a Board and its Piece objects.
+
+FEN follows the PDN convention, with squares numbered 1-50 as in
+checkers/moves.py and K marking kings:
+
+    B:W31,32,...,50:B1,2,...,20      (the initial position, BLUE to move)
+
+W is RED and B is BLUE. RED starts on 31-50, the squares of White in
+international draughts, so other PDN tools show the board the right way up.
+Ranges such as "31-50" are accepted when parsing.
+
+The binary form is one little-endian 160-bit integer: bits 0-49 mark RED
+pieces, bits 50-99 BLUE pieces, bits 100-149 kings, and bit 150 is set when
+RED is to move.
+"""
+import hashlib
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from checkers.moves import SQUARES, square_index, square_coords
+
+POSITION_BYTES = 20
+_FEN_COLORS = {RED: 'W', BLUE: 'B'}
+_COLORS = {letter: color for color, letter in _FEN_COLORS.items()}
+_BLUE_SHIFT = SQUARES
+_KING_SHIFT = 2 * SQUARES
+_TURN_BIT = 1 << (3 * SQUARES)
+
+
+def board_pieces(board):
+    """[(square, color, king)] of every piece on board, by square."""
+    pieces = []
+    for color in (RED, BLUE):
+        for row, col in board.pieces[color]:
+            pieces.append((square_index(row, col), color, board.get_piece(row, col).king))
+    return sorted(pieces)
+
+
+def position_board(pieces, turn):
+    """Board holding pieces ((square, color, king) triples); the position counts as seen once."""
+    board = Board((*square_coords(square), color, king) for square, color, king in pieces)
+    board.position_counts[board.position_key(turn)] = 1
+    return board
+
+
+def to_fen(board, turn):
+    return _fen(board_pieces(board), turn)
+
+
+def _fen(pieces, turn):
+    fields = [_FEN_COLORS[turn]]
+    for color in (RED, BLUE):
+        squares = ','.join(f"{'K' if king else ''}{square + 1}" for square, c, king in pieces if c == color)
+        fields.append(_FEN_COLORS[color] + squares)
+    return ':'.join(fields)
+
+
+def parse_fen(text):
+    """(pieces, turn) of a FEN string; raises ValueError if it is malformed."""
+    fields = text.strip().rstrip('.').split(':')
+    if len(fields) != 3 or fields[0].upper() not in _COLORS:
+        raise ValueError(f"Malformed FEN {text!r}: expected '<side>:W<squares>:B<squares>'")
+    turn = _COLORS[fields[0].upper()]
+    pieces = {}
+    for field in fields[1:]:
+        if not field or field[0].upper() not in _COLORS:
+            raise ValueError(f"Malformed FEN {text!r}: piece lists start with W or B")
+        color = _COLORS[field[0].upper()]
+        for item in filter(None, field[1:].split(',')):
+            king = item[0].upper() == 'K'
+            numbers = item[1:] if king else item
+            try:
+                first, _, last = numbers.partition('-')
+                squares = range(int(first), int(last or first) + 1)
+            except ValueError:
+                raise ValueError(f"Malformed FEN {text!r}: bad square {item!r}")
+            for number in squares:
+                if not 1 <= number <= SQUARES or number - 1 in pieces:
+                    raise ValueError(f"Malformed FEN {text!r}: square {number} is invalid or given twice")
+                pieces[number - 1] = (color, king)
+    return [(square, color, king) for square, (color, king) in sorted(pieces.items())], turn
+
+
+def from_fen(text):
+    """(board, turn) of a FEN string."""
+    pieces, turn = parse_fen(text)
+    return position_board(pieces, turn), turn
+
+
+def to_bytes(board, turn):
+    return _bytes(board_pieces(board), turn)
+
+
+def _bytes(pieces, turn):
+    bits = _TURN_BIT if turn == RED else 0
+    for square, color, king in pieces:
+        bits |= 1 << (square + (0 if color == RED else _BLUE_SHIFT))
+        if king:
+            bits |= 1 << (square + _KING_SHIFT)
+    return bits.to_bytes(POSITION_BYTES, 'little')
+
+
+def parse_bytes(data):
+    """(pieces, turn) of the binary form; raises ValueError if it is not a valid position."""
+    if len(data) != POSITION_BYTES:
+        raise ValueError(f"A position is {POSITION_BYTES} bytes, got {len(data)}")
+    bits = int.from_bytes(data, 'little')
+    mask = (1 << SQUARES) - 1
+    red, blue, kings = bits & mask, (bits >> _BLUE_SHIFT) & mask, (bits >> _KING_SHIFT) & mask
+    if red & blue or kings & ~(red | blue) or bits >> (3 * SQUARES + 1):
+        raise ValueError("Invalid position bytes")
+    pieces = []
+    occupied = red | blue
+    while occupied:
+        low = occupied & -occupied
+        square = low.bit_length() - 1
+        pieces.append((square, RED if red & low else BLUE, bool(kings & low)))
+        occupied ^= low
+    return pieces, RED if bits & _TURN_BIT else BLUE
+
+
+def from_bytes(data):
+    """(board, turn) of the binary form."""
+    pieces, turn = parse_bytes(data)
+    return position_board(pieces, turn), turn
+
+
+def position_hash(data):
+    """64-bit content hash of a binary position, stable across processes and runs."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def fen_to_bytes(text):
+    return _bytes(*parse_fen(text))
+
+
+def bytes_to_fen(data):
+    return _fen(*parse_bytes(data))
@@ -0,0 +1,59 @@
+from checkers.constants import ROWS, COLS, RED, BLUE
+from checkers.moves import SQUARES, square_index, square_coords, move_from, move_to, move_coords
+
+# One byte per dark square
+EMPTY, RED_MAN, RED_KING, BLUE_MAN, BLUE_KING = range(5)
+_CODES = {(RED, False): RED_MAN, (RED, True): RED_KING, (BLUE, False): BLUE_MAN, (BLUE, True): BLUE_KING}
+_PIECES = {code: piece for piece, code in _CODES.items()}
+
+
+class Snapshot:
+    """Immutable copy of a position, published by the engine for the GUI.
+
+    squares holds one code per dark square (see checkers/moves.py for the
+    numbering). legal_moves are the encoded moves of the side to move, so the
+    GUI can validate clicks without touching the engine's Board.
+    """
+    __slots__ = ('squares', 'turn', 'last_move', 'legal_moves', 'key', 'ply')
+
+    def __init__(self, squares, turn, last_move=None, legal_moves=(), key=0, ply=0):
+        object.__setattr__(self, 'squares', bytes(squares))
+        object.__setattr__(self, 'turn', turn)
+        object.__setattr__(self, 'last_move', last_move)
+        object.__setattr__(self, 'legal_moves', tuple(legal_moves))
+        object.__setattr__(self, 'key', key)  # position_key() of the position
+        object.__setattr__(self, 'ply', ply)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    @classmethod
+    def from_board(cls, board, turn, last_move=None, ply=0):
+        squares = bytearray(SQUARES)
+        for color in (RED, BLUE):
+            for row, col in board.pieces[color]:
+                squares[square_index(row, col)] = _CODES[(color, board.get_piece(row, col).king)]
+        return cls(squares, turn, last_move, board.legal_moves(turn), board.position_key(turn), ply)
+
+    def piece_at(self, row, col):
+        """(color, king) of the piece on (row, col), or None."""
+        if (row + col) % 2 == 0 or not (0 <= row < ROWS and 0 <= col < COLS):
+            return None
+        return _PIECES.get(self.squares[square_index(row, col)])
+
+    def pieces(self):
+        """{(row, col): (color, king)} for every piece on the board."""
+        return {square_coords(sq): _PIECES[code] for sq, code in enumerate(self.squares) if code != EMPTY}
+
+    def moves_from(self, row, col):
+        """Legal moves of the side to move starting on (row, col)."""
+        sq = square_index(row, col)
+        return [move for move in self.legal_moves if move_from(move) == sq]
+
+    def find_move(self, from_row, from_col, to_row, to_col):
+        """First legal move from one square to another, or None."""
+        sq = square_index(to_row, to_col)
+        return next((move for move in self.moves_from(from_row, from_col) if move_to(move) == sq), None)
+
+    def last_move_coords(self):
+        return move_coords(self.last_move) if self.last_move is not None else None
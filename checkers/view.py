@@ -0,0 +1,77 @@
+import pygame
+from checkers.constants import WIDTH, HEIGHT, ROWS, COLS, SQUARE_SIZE, WHITE, GREY
+from checkers.pieces import Piece
+
+HIGHLIGHT = (0, 255, 0)
+
+class BoardView:
+    """Incremental renderer for engine Snapshots (see checkers/snapshot.py).
+
+    The checkerboard is drawn once into a cached surface. Each frame only the
+    squares whose piece or highlight changed since the previous frame are
+    repainted and pushed with a partial display update. When nothing changed,
+    render() returns without drawing anything.
+    """
+    def __init__(self, win):
+        self.win = win
+        self.background = None
+        self.drawn = None  # (row, col) -> (color, king) as last drawn; None forces a full redraw
+        self.drawn_snapshot = None
+        self.drawn_highlights = set()
+
+    def invalidate(self):
+        """Repaint everything on the next render (after menus or window exposure)."""
+        self.drawn = None
+
+    def render(self, snapshot, highlights=()):
+        """Draw what changed since the last call; returns True if the display was updated."""
+        highlights = set(highlights)
+        if self.drawn is not None and snapshot is self.drawn_snapshot and highlights == self.drawn_highlights:
+            return False
+
+        contents = snapshot.pieces()
+        if self.drawn is None:
+            if self.background is None:
+                self.background = self._render_background()
+            self.win.blit(self.background, (0, 0))
+            for (row, col), (color, king) in contents.items():
+                self._draw_piece(row, col, color, king)
+            for row, col in highlights:
+                self._draw_highlight(row, col)
+            pygame.display.update()
+        else:
+            dirty = {square for square in contents.keys() | self.drawn.keys()
+                     if contents.get(square) != self.drawn.get(square)}
+            dirty |= highlights ^ self.drawn_highlights
+            rects = []
+            for row, col in dirty:
+                rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+                self.win.blit(self.background, rect, rect)
+                if (row, col) in contents:
+                    self._draw_piece(row, col, *contents[(row, col)])
+                if (row, col) in highlights:
+                    self._draw_highlight(row, col)
+                rects.append(rect)
+            pygame.display.update(rects)
+
+        self.drawn = contents
+        self.drawn_snapshot = snapshot
+        self.drawn_highlights = highlights
+        return True
+
+    def _render_background(self):
+        surface = pygame.Surface((WIDTH, HEIGHT))
+        surface.fill(WHITE)
+        for row in range(ROWS):
+            for col in range(row % 2, COLS, 2):
+                pygame.draw.rect(surface, GREY, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        return surface
+
+    def _draw_piece(self, row, col, color, king):
+        piece = Piece(row, col, color)
+        if king:
+            piece.make_king()
+        piece.draw(self.win)
+
+    def _draw_highlight(self, row, col):
+        pygame.draw.circle(self.win, HIGHLIGHT, (col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2), 15)
@@ -0,0 +1,20 @@
+# zobrist.py
+import random
+from checkers.constants import ROWS, COLS, RED, BLUE
+
+# Fixed seed so hashes are stable across runs (opening books store them on disk)
+_rng = random.Random(0x5EED_D8A7)
+
+# One 64-bit key per (square, kind): kind 0 = red man, 1 = red king, 2 = blue man, 3 = blue king
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(4)] for _ in range(ROWS * COLS)]
+# XORed in when BLUE is to move
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def piece_key(piece, row, col):
+    kind = (0 if piece.color == RED else 2) + (1 if piece.king else 0)
+    return PIECE_KEYS[row * COLS + col][kind]
+
+
+def side_key(turn):
+    return SIDE_KEY if turn == BLUE else 0
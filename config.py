@@ -0,0 +1,38 @@
+# config.py
+
+# Opening book consulted by game_logic before searching (built with experiments/build_book.py).
+# Set to None to always search.
+OPENING_BOOK_PATH = 'opening_book.bin'
+
+# Memory caps (bytes) for the process-wide caches in mcts/cache.py
+EVALUATION_CACHE_BYTES = 32 * 1024 * 1024
+MOVE_CACHE_BYTES = 64 * 1024 * 1024
+
+# SPRT early stopping for AI vs AI series ("SPRT" in the game count menu).
+# The test is on the Elo of the RED engine relative to BLUE.
+SPRT_ELO0 = 0.0
+SPRT_ELO1 = 50.0
+SPRT_ALPHA = 0.05
+SPRT_BETA = 0.05
+SPRT_MAX_GAMES = 1000
+
+# Game clock for AI moves in game_logic: seconds per side for the whole game plus an
+# increment per move (mcts/time_manager.py splits it into per-move budgets).
+# Set GAME_CLOCK_SECONDS to None to search a fixed number of iterations per move.
+GAME_CLOCK_SECONDS = None
+GAME_CLOCK_INCREMENT = 0.0
+
+# Root move allocation for the searchers in game_logic: 'ucb' or 'sequential_halving'.
+# Sequential halving spreads small budgets more evenly over the root moves, but it always
+# spends the whole budget: early stopping and the time it banks on the game clock are UCB only.
+ROOT_POLICY = 'ucb'
+
+# Pondering in Player vs AI games: the AI keeps searching while the human thinks and
+# continues from the subtree of the move that was played (mcts/ponder.py).
+# PONDER_MAX_ITERATIONS bounds the size (and memory) of the pondered tree.
+PONDER = True
+PONDER_MAX_ITERATIONS = 5000
+
+# Every game played in main.py is appended to this PDN archive as it is played
+# (checkers/pdn.py). Set to None to disable recording.
+GAME_ARCHIVE_PATH = 'games.pdn'
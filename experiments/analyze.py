@@ -0,0 +1,170 @@
+"""Batch analysis of positions with any searcher.
+
+    python -m experiments.analyze positions.fen --searcher MCTS --time-per-move 0.5 > analysis.jsonl
+    python -m experiments.analyze games.pdn --lost-by MCTS --iterations 2000 --output lost.jsonl
+
+Inputs are files of FEN lines ('#' starts a comment) or PDN archives, which
+are recognised by their .pdn extension; '-' reads FEN lines from stdin. Every
+position of every PDN game is analysed. With --lost-by, only games lost by the
+player of that name (the White/Black tag) are used, and only the positions
+where that player was to move. A --config JSON searcher configuration (see
+experiments/match.py) overrides --searcher.
+
+Positions are read lazily and searched by a process pool. Results are written
+as one JSON object per line, in input order, as soon as they are ready:
+
+    {"index": 0, "source": "games.pdn:3:41", "fen": "...", "turn": "red",
+     "move": 123, "notation": "32-28", "value": 0.62, "proven": null,
+     "iterations": 2000, "reason": "budget", "elapsed": 0.5,
+     "children": [{"move": ..., "notation": ..., "visits": ..., "value": ...}, ...]}
+
+value is the chosen move's mean result for the side to move (1 is a win).
+proven is "win" or "loss" when the solver settled it. children lists the
+--top most visited root moves. Positions are searched from their placement
+alone, so repetitions from before a position are not known to the search.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from collections import deque
+from multiprocessing import Pool
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # checkers.board imports pygame, whose banner would corrupt JSONL on stdout
+from checkers.constants import RED
+from checkers.moves import move_to_str
+from checkers.pdn import read_games
+from checkers.position import to_bytes, from_bytes, fen_to_bytes, bytes_to_fen
+from experiments.match import SEARCHERS, make_searcher
+from mcts.solver import WIN, LOSS
+from mcts.stepper import SearchStepper
+
+SLICE_ITERATIONS = 64
+QUEUED_PER_WORKER = 4  # Positions read ahead per worker
+
+
+def read_positions(paths, lost_by=None):
+    """Yield (source, binary position) for every position in the inputs, lazily."""
+    for path in paths:
+        if path.endswith('.pdn'):
+            for number, game in enumerate(read_games(path), 1):
+                loser = None
+                if lost_by is not None:
+                    loser = {'2-0': 'Black', '1-0': 'Black', '0-2': 'White', '0-1': 'White'}.get(game.result)
+                    if loser is None or game.tags.get(loser) != lost_by:
+                        continue
+                for ply, (board, turn, _) in enumerate(game.positions()):
+                    if loser is None or (turn == RED) == (loser == 'White'):
+                        yield f"{path}:{number}:{ply}", to_bytes(board, turn)
+        else:
+            f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+            try:
+                for number, line in enumerate(f, 1):
+                    line = line.split('#', 1)[0].strip()
+                    if not line:
+                        continue
+                    try:
+                        yield f"{path}:{number}", fen_to_bytes(line)
+                    except ValueError as e:
+                        print(f"Skipping {path}:{number}: {e}", file=sys.stderr)
+            finally:
+                if f is not sys.stdin:
+                    f.close()
+
+
+def analyze_position(args):
+    """Search one position; returns its JSON-ready result."""
+    index, source, position, config, time_per_move, top, seed = args
+    random.seed(seed + index)
+    board, turn = from_bytes(position)
+    searcher = make_searcher(config, board, turn)
+    if time_per_move:
+        if 'iterations' not in config:
+            searcher.iterations = 10 ** 9  # The time budget is the only limit
+        searcher.time_limit = time_per_move
+    stepper = SearchStepper(searcher)
+    while not stepper.step(SLICE_ITERATIONS):
+        pass
+    move = stepper.best_move()
+    chosen = next((child for child in stepper.root.children if child.move == move), None)
+    stats = searcher.last_search_stats
+    children = sorted(stepper.root.children, key=lambda c: c.visits, reverse=True)[:top]
+    return {
+        'index': index,
+        'source': source,
+        'fen': bytes_to_fen(position),
+        'turn': 'red' if turn == RED else 'blue',
+        'move': move,
+        'notation': move_to_str(move) if move is not None else None,
+        'value': _value(chosen),
+        'proven': {WIN: 'win', LOSS: 'loss'}.get(chosen.proven) if chosen else None,
+        'iterations': stats['iterations'],
+        'reason': stats['reason'],
+        'elapsed': round(stats['elapsed'], 4),
+        'children': [{'move': child.move, 'notation': move_to_str(child.move), 'visits': child.visits,
+                      'value': _value(child)} for child in children],
+    }
+
+
+def _value(child):
+    """Mean result for the player who made child.move, exact when proven."""
+    if child is None:
+        return None
+    if child.proven is not None:
+        return 1.0 if child.proven == WIN else 0.0
+    return round(child.wins / child.visits, 4) if child.visits else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help='FEN files, PDN archives (.pdn) or - for FEN lines on stdin')
+    parser.add_argument('--searcher', choices=sorted(SEARCHERS), default='MCTS')
+    parser.add_argument('--config', help='searcher configuration as JSON, or a JSON file')
+    parser.add_argument('--iterations', type=int, default=None, help='iteration budget per position')
+    parser.add_argument('--time-per-move', type=float, default=None, help='time budget per position in seconds')
+    parser.add_argument('--lost-by', help='only PDN games lost by this player, at their turns')
+    parser.add_argument('--top', type=int, default=5, help='root moves listed per position')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSONL file (default: stdout)')
+    args = parser.parse_args()
+
+    if args.config:
+        if os.path.exists(args.config):
+            with open(args.config) as f:
+                config = json.load(f)
+        else:
+            config = json.loads(args.config)
+    else:
+        config = {'class': args.searcher}
+    if args.iterations is not None:
+        config['iterations'] = args.iterations
+    if not args.time_per_move and 'iterations' not in config:
+        config['iterations'] = 1000
+    make_searcher(config, None, RED)  # Fail on a bad configuration before starting the pool
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    count = 0
+    try:
+        with Pool(args.workers) as pool:
+            # A bounded window of queued positions keeps memory flat however long the input is;
+            # results are written in input order as soon as the oldest one is done
+            pending = deque()
+            for index, (source, position) in enumerate(read_positions(args.inputs, args.lost_by)):
+                job = (index, source, position, config, args.time_per_move, args.top, args.seed)
+                pending.append(pool.apply_async(analyze_position, (job,)))
+                while len(pending) >= QUEUED_PER_WORKER * args.workers or (pending and pending[0].ready()):
+                    output.write(json.dumps(pending.popleft().get()) + '\n')
+                    count += 1
+                output.flush()
+            while pending:
+                output.write(json.dumps(pending.popleft().get()) + '\n')
+                count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Analysed {count} positions", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
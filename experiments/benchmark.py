@@ -0,0 +1,99 @@
+"""Search throughput benchmark over a fixed set of positions.
+
+    python -m experiments.benchmark --searcher MCTS --time-per-move 0.2
+    python -m experiments.benchmark --configs rollouts.json --positions 40
+
+Every configuration searches the same positions, which come from seeded random
+games at a spread of game phases. The output shows iterations per second and
+time per search for each configuration. It also shows how often its move
+matches the first configuration's. Without --configs, the searcher is run once
+per rollout policy (MCTSPROGRESSIVE, which has no evaluator, supports only 'fixed'):
+
+    [{"name": "fixed", "class": "MCTS", "rollout_policy": "fixed"},
+     {"name": "margin", "class": "MCTS", "rollout_policy": "margin", "rollout_margin": 0.1},
+     {"name": "evaluate", "class": "MCTS", "rollout_policy": "evaluate"}]
+
+Throughput alone does not show strength. To check that, play the winning
+configurations against each other with experiments/ladder.py.
+"""
+import argparse
+import copy
+import json
+import random
+import time
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from experiments.match import SEARCHERS, make_searcher, config_name
+
+ROLLOUT_POLICIES = ('fixed', 'margin', 'evaluate')
+
+
+def benchmark_positions(count, seed, max_plies=80):
+    """(board, turn) pairs taken from random games at evenly spread plies."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        turn = BLUE
+        target = rng.randrange(max_plies)
+        for _ in range(target):
+            if board.get_winner() is not None or board.is_draw():
+                break
+            board.make_move(rng.choice(board.legal_moves(turn)))
+            turn = BLUE if turn == RED else RED
+        else:
+            if len(board.legal_moves(turn)) > 1:
+                positions.append((board, turn))
+    return positions
+
+
+def run_config(config, positions, time_per_move, seed):
+    random.seed(seed)
+    iterations = 0
+    elapsed = 0.0
+    moves = []
+    for board, turn in positions:
+        searcher = make_searcher(config, copy.deepcopy(board), turn)
+        if time_per_move:
+            searcher.iterations = 10 ** 9  # The time budget is the only limit
+            searcher.time_limit = time_per_move
+        searcher.early_stop = False  # Measure the full budget
+        start = time.perf_counter()
+        moves.append(searcher.search())
+        elapsed += time.perf_counter() - start
+        iterations += searcher.last_search_stats['iterations']
+    return {'iterations': iterations, 'elapsed': elapsed, 'moves': moves}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--searcher', choices=sorted(SEARCHERS), default='MCTS')
+    parser.add_argument('--configs', help='JSON file with a list of searcher configurations')
+    parser.add_argument('--positions', type=int, default=20)
+    parser.add_argument('--time-per-move', type=float, default=0.2,
+                        help='search budget in seconds; 0 searches each configuration\'s iteration count instead')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.configs:
+        with open(args.configs) as f:
+            configs = json.load(f)
+    else:
+        if args.searcher == 'MCTSPROGRESSIVE':
+            parser.error("MCTSPROGRESSIVE has only the 'fixed' rollout policy; compare it through --configs")
+        configs = [{'name': policy, 'class': args.searcher, 'rollout_policy': policy} for policy in ROLLOUT_POLICIES]
+
+    positions = benchmark_positions(args.positions, args.seed)
+    results = [run_config(config, positions, args.time_per_move, args.seed) for config in configs]
+
+    reference = results[0]['moves']
+    print(f"{'Configuration':<40}{'iter/s':>10}{'ms/search':>12}{'same move':>12}")
+    for config, result in zip(configs, results):
+        rate = result['iterations'] / result['elapsed'] if result['elapsed'] else 0.0
+        per_search = 1000.0 * result['elapsed'] / len(positions)
+        agreement = sum(a == b for a, b in zip(result['moves'], reference)) / len(positions)
+        print(f"{config_name(config):<40}{rate:>10.0f}{per_search:>12.1f}{agreement:>11.0%}")
+
+
+if __name__ == '__main__':
+    main()
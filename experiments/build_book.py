@@ -0,0 +1,79 @@
+"""Build an opening book from batches of deep self-play searches.
+
+    python -m experiments.build_book --games 200 --depth 8 --iterations 300
+
+Every game starts from Board(); the first --depth plies are played with a deep
+search and each (position, move) pair is credited with the final game result.
+Later plies are played with --playout-iterations to finish the game quickly.
+"""
+import argparse
+import copy
+import os
+import random
+from multiprocessing import Pool
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from mcts.opening_book import write_book, read_book_stats
+from experiments.match import SEARCHERS, MAX_PLIES
+
+
+def play_book_game(args):
+    """Play one self-play game, returning [(key, move, mover)] and the winner."""
+    searcher_name, depth, iterations, playout_iterations, first_turn, seed = args
+    random.seed(seed)
+    searcher = SEARCHERS[searcher_name]
+    board = Board()
+    turn = first_turn
+    book_moves = []
+    winner = None
+
+    for ply in range(MAX_PLIES):
+        winner = board.get_winner()
+        if winner is not None or board.is_draw():
+            break
+        budget = iterations if ply < depth else playout_iterations
+        move = searcher(copy.deepcopy(board), turn, iterations=budget).search()
+        if not move:
+            winner = BLUE if turn == RED else RED
+            break
+        if ply < depth:
+            book_moves.append((board.position_key(turn), move, turn))
+        board.make_move(move)
+        turn = BLUE if turn == RED else RED
+
+    return book_moves, winner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--searcher', choices=sorted(SEARCHERS), default='MCTS')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--depth', type=int, default=8, help='number of plies stored in the book')
+    parser.add_argument('--iterations', type=int, default=300, help='search budget for book plies')
+    parser.add_argument('--playout-iterations', type=int, default=15, help='search budget after the book plies')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='opening_book.bin')
+    parser.add_argument('--merge', action='store_true', help='add to the statistics already in --output')
+    args = parser.parse_args()
+
+    stats = read_book_stats(args.output) if args.merge and os.path.exists(args.output) else {}
+    jobs = [(args.searcher, args.depth, args.iterations, args.playout_iterations,
+             BLUE if game % 2 == 0 else RED, args.seed + game)
+            for game in range(args.games)]
+
+    with Pool(args.workers) as pool:
+        for game, (book_moves, winner) in enumerate(pool.imap_unordered(play_book_game, jobs), 1):
+            for key, move, mover in book_moves:
+                score = 0.5 if winner is None else (1.0 if winner == mover else 0.0)
+                entry = stats.setdefault((key, move), [0, 0.0])
+                entry[0] += 1
+                entry[1] += score
+            print(f"Game {game}/{args.games} done, {len(stats)} book entries")
+
+    write_book(args.output, stats)
+    print(f"Wrote {len(stats)} entries to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
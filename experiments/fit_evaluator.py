@@ -0,0 +1,77 @@
+"""Fit a LinearEvaluator (mcts/evaluator.py) to self-play data.
+
+    python -m experiments.fit_evaluator data/selfplay --steps 3000 --output weights.npz
+
+Logistic regression of the game outcome for the side to move (win 1, draw
+0.5, loss 0) on the features of mcts/features.py, trained with Adam on random
+minibatches streamed from the shards of experiments/selfplay.py. A held-out
+set of records is scored every --report steps. The saved weights are then
+used by a searcher with "evaluator": "weights.npz".
+"""
+import argparse
+import numpy as np
+from experiments.selfplay import ShardDataset
+from mcts.evaluator import LinearEvaluator
+from mcts.features import FEATURES, extract_features, mobility, planes_board
+
+ADAM_BETAS = (0.9, 0.999)
+ADAM_EPSILON = 1e-8
+
+
+def record_features(records):
+    """(features, targets) of a batch of self-play records."""
+    mobilities = [mobility(*planes_board(planes)) for planes in records['planes']]
+    features = extract_features(records['planes'], mobilities)
+    targets = (records['outcome'].astype(np.float32) + 1) / 2
+    return features, targets
+
+
+def log_loss(evaluator, features, targets):
+    p = np.clip(evaluator.evaluate_features(features), 1e-7, 1 - 1e-7)
+    return float(-np.mean(targets * np.log(p) + (1 - targets) * np.log(1 - p)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data', help='directory written by experiments.selfplay')
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--learning-rate', type=float, default=0.01)
+    parser.add_argument('--l2', type=float, default=1e-4, help='weight decay')
+    parser.add_argument('--holdout', type=int, default=2048, help='records kept out of training')
+    parser.add_argument('--report', type=int, default=200, help='steps between held-out scores')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='weights.npz')
+    args = parser.parse_args()
+
+    dataset = ShardDataset(args.data)
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(dataset))
+    holdout = min(args.holdout, len(dataset) // 5)
+    train = order[holdout:]
+    test_features, test_targets = record_features(dataset.get(np.sort(order[:holdout])))
+    print(f"{len(dataset)} records: {len(train)} for training, {holdout} held out")
+
+    evaluator = LinearEvaluator(np.zeros(FEATURES), 0.0)
+    if holdout:
+        print(f"step 0: held-out log loss {log_loss(evaluator, test_features, test_targets):.4f}")
+    moments = np.zeros((2, FEATURES + 1))
+    for step in range(1, args.steps + 1):
+        features, targets = record_features(dataset.get(rng.choice(train, args.batch_size)))
+        errors = evaluator.evaluate_features(features) - targets
+        gradient = np.append(features.T @ errors / len(errors) + args.l2 * evaluator.weights, errors.mean())
+        moments[0] = ADAM_BETAS[0] * moments[0] + (1 - ADAM_BETAS[0]) * gradient
+        moments[1] = ADAM_BETAS[1] * moments[1] + (1 - ADAM_BETAS[1]) * gradient ** 2
+        update = (args.learning_rate * moments[0] / (1 - ADAM_BETAS[0] ** step)
+                  / (np.sqrt(moments[1] / (1 - ADAM_BETAS[1] ** step)) + ADAM_EPSILON))
+        evaluator.weights -= update[:FEATURES].astype(np.float32)
+        evaluator.bias -= float(update[FEATURES])
+        if holdout and (step % args.report == 0 or step == args.steps):
+            print(f"step {step}: held-out log loss {log_loss(evaluator, test_features, test_targets):.4f}")
+
+    evaluator.save(args.output)
+    print(f"Weights saved to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
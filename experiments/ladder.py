@@ -0,0 +1,181 @@
+"""Round-robin rating ladder across searcher configurations.
+
+    python -m experiments.ladder ladder.json --games-per-pair 20 --plot ladder.png
+
+ladder.json holds a list of searcher configurations (see experiments/match.py):
+
+    [
+        {"name": "mcts-30", "class": "MCTS", "iterations": 30},
+        {"name": "prog-k2", "class": "MCTSPROGRESSIVE", "iterations": 30, "k": 2.0, "alpha": 0.4},
+        {"name": "material", "class": "MCTSMaterialHeuristic", "iterations": 30, "king_value": 5.0}
+    ]
+
+Every pair plays the same number of games with colours and the first move
+alternated. Ratings are fitted with a Bradley-Terry model (draws count as half a
+win for each side), reported as Elo relative to the field average with bootstrap
+95% error bars, and plotted against CPU time per move.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import random
+from itertools import combinations
+from multiprocessing import Pool
+from checkers.constants import RED, BLUE
+from experiments.match import play_game, score_for, config_name, archive_game
+from checkers.pdn import PdnArchive
+
+
+def schedule(num_configs, games_per_pair, seed):
+    """Balanced round robin: (i, j, red, blue, first_turn, seed) for every game."""
+    jobs = []
+    for i, j in combinations(range(num_configs), 2):
+        for game in range(games_per_pair):
+            red, blue = (i, j) if game % 2 == 0 else (j, i)
+            first_turn = BLUE if (game // 2) % 2 == 0 else RED
+            jobs.append((i, j, red, blue, first_turn, seed + len(jobs)))
+    return jobs
+
+
+def _run_game(args):
+    configs, (i, j, red, blue, first_turn, seed) = args
+    result = play_game(configs[red], configs[blue], first_turn, seed)
+    return red, blue, result
+
+
+def fit_bradley_terry(games, num_players, iterations=1000, tolerance=1e-9):
+    """Fit strengths from [(a, b, score_of_a)] with the MM algorithm; returns Elo per player."""
+    wins = [0.0] * num_players
+    pair_games = {}
+    for a, b, score in games:
+        wins[a] += score
+        wins[b] += 1.0 - score
+        key = (min(a, b), max(a, b))
+        pair_games[key] = pair_games.get(key, 0) + 1
+
+    # A half-win prior against a virtual average opponent keeps unbeaten or winless players finite
+    strength = [1.0] * num_players
+    for _ in range(iterations):
+        new_strength = []
+        for i in range(num_players):
+            denominator = 1.0 / (strength[i] + 1.0)
+            for (a, b), n in pair_games.items():
+                if a == i:
+                    denominator += n / (strength[i] + strength[b])
+                elif b == i:
+                    denominator += n / (strength[i] + strength[a])
+            new_strength.append((wins[i] + 0.5) / denominator)
+        geometric_mean = math.exp(sum(math.log(s) for s in new_strength) / num_players)
+        new_strength = [s / geometric_mean for s in new_strength]
+        delta = max(abs(math.log(n) - math.log(o)) for n, o in zip(new_strength, strength))
+        strength = new_strength
+        if delta < tolerance:
+            break
+    return [400.0 * math.log10(s) for s in strength]
+
+
+def bootstrap_errors(games, num_players, samples, rng):
+    """Half-width of the 95% bootstrap interval of each player's Elo."""
+    fits = []
+    for _ in range(samples):
+        resampled = [games[rng.randrange(len(games))] for _ in games]
+        fits.append(fit_bradley_terry(resampled, num_players, iterations=200, tolerance=1e-6))
+    errors = []
+    for i in range(num_players):
+        values = sorted(fit[i] for fit in fits)
+        low = values[int(0.025 * (samples - 1))]
+        high = values[int(0.975 * (samples - 1))]
+        errors.append((high - low) / 2.0)
+    return errors
+
+
+def plot_ladder(rows, path):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; skipping the plot (the CSV has the same data)")
+        return
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.errorbar([row['cpu_ms_per_move'] for row in rows], [row['elo'] for row in rows],
+                yerr=[row['elo_error'] for row in rows], fmt='o', capsize=4)
+    for row in rows:
+        ax.annotate(row['name'], (row['cpu_ms_per_move'], row['elo']), textcoords='offset points', xytext=(5, 5))
+    ax.set_xscale('log')
+    ax.set_xlabel('CPU time per move (ms)')
+    ax.set_ylabel('Elo (relative to field average)')
+    ax.set_title('Strength vs CPU time per move')
+    ax.grid(True, alpha=0.3)
+    fig.savefig(path, bbox_inches='tight')
+    print(f"Wrote plot to '{path}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('configs', help='JSON file with a list of searcher configurations')
+    parser.add_argument('--games-per-pair', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bootstrap', type=int, default=200, help='resamples for the error bars')
+    parser.add_argument('--output', default='ladder.csv')
+    parser.add_argument('--plot', default='ladder.png')
+    parser.add_argument('--archive', help='append every game to this PDN file')
+    args = parser.parse_args()
+
+    with open(args.configs) as f:
+        configs = json.load(f)
+    if len(configs) < 2:
+        parser.error('the ladder needs at least two configurations')
+    names = [config_name(config) for config in configs]
+
+    archive = PdnArchive(args.archive) if args.archive else None
+    jobs = schedule(len(configs), args.games_per_pair, args.seed)
+    games = []  # (red index, blue index, red score)
+    cpu_time = [0.0] * len(configs)
+    moves = [0] * len(configs)
+    with Pool(args.workers) as pool:
+        for done, (red, blue, result) in enumerate(pool.imap_unordered(_run_game, [(configs, job) for job in jobs]), 1):
+            games.append((red, blue, score_for(result, RED)))
+            cpu_time[red] += result['cpu_red']
+            cpu_time[blue] += result['cpu_blue']
+            moves[red] += result['moves_red']
+            moves[blue] += result['moves_blue']
+            if archive:
+                archive_game(archive, configs[red], configs[blue], result)
+            print(f"[{done}/{len(jobs)}] {names[red]} (RED) vs {names[blue]} (BLUE): "
+                  f"{score_for(result, RED):g}-{score_for(result, BLUE):g}")
+
+    elo = fit_bradley_terry(games, len(configs))
+    errors = bootstrap_errors(games, len(configs), args.bootstrap, random.Random(args.seed))
+    rows = []
+    for i, name in enumerate(names):
+        played = [g for g in games if i in (g[0], g[1])]
+        score = sum(g[2] if g[0] == i else 1.0 - g[2] for g in played)
+        rows.append({
+            'name': name,
+            'elo': elo[i],
+            'elo_error': errors[i],
+            'games': len(played),
+            'score': score,
+            'cpu_ms_per_move': 1000.0 * cpu_time[i] / moves[i] if moves[i] else 0.0,
+        })
+    rows.sort(key=lambda row: row['elo'], reverse=True)
+
+    print(f"\n{'Rank':<5}{'Configuration':<40}{'Elo':>8}{'+/-':>8}{'Score':>10}{'ms/move':>10}")
+    for rank, row in enumerate(rows, 1):
+        print(f"{rank:<5}{row['name']:<40}{row['elo']:>8.1f}{row['elo_error']:>8.1f}"
+              f"{row['score']:>6.1f}/{row['games']:<3}{row['cpu_ms_per_move']:>10.1f}")
+
+    with open(args.output, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote ratings to '{args.output}'")
+    plot_ladder(rows, args.plot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Headless games between searcher configurations.
+
+A searcher configuration is a dict naming the searcher class plus any attributes
+to override, e.g. {"class": "MCTSPROGRESSIVE", "iterations": 30, "k": 2.0}.
+"""
+import copy
+import json
+import random
+import time
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from mcts.mcts import MCTS
+from mcts.hueristics import MCTSHEURISTIC
+from mcts.progressive_widening import MCTSPROGRESSIVE
+from mcts.heuristics_material import MCTSMaterialHeuristic
+from mcts.time_manager import TimeManager
+from checkers.pdn import UNFINISHED
+
+SEARCHERS = {
+    'MCTS': MCTS,
+    'MCTSHEURISTIC': MCTSHEURISTIC,
+    'MCTSPROGRESSIVE': MCTSPROGRESSIVE,
+    'MCTSMaterialHeuristic': MCTSMaterialHeuristic,
+}
+
+DEFAULT_ITERATIONS = 30
+MAX_PLIES = 200  # Unfinished games are scored as draws, like games drawn by rule
+
+
+def config_name(config):
+    if 'name' in config:
+        return config['name']
+    params = ', '.join(f"{key}={value}" for key, value in sorted(config.items()) if key != 'class')
+    return f"{config['class']}({params})"
+
+
+def make_searcher(config, board, player):
+    """Instantiate the searcher described by config for player on board."""
+    try:
+        searcher_class = SEARCHERS[config['class']]
+    except KeyError:
+        raise ValueError(f"Unknown searcher class in {config!r}; expected one of {sorted(SEARCHERS)}")
+    searcher = searcher_class(board, player, iterations=config.get('iterations', DEFAULT_ITERATIONS))
+    for key, value in config.items():
+        if key in ('class', 'name', 'iterations'):
+            continue
+        if not hasattr(searcher, key):
+            raise ValueError(f"{config['class']} has no parameter '{key}'")
+        setattr(searcher, key, value)
+    return searcher
+
+
+def play_game(red_config, blue_config, first_turn=BLUE, seed=None, max_plies=MAX_PLIES, clock=None):
+    """Play one game and return its result and per-side CPU usage.
+
+    clock is an optional (total seconds, increment) game clock per side; without
+    it each search uses the iteration count and time_limit of its configuration.
+    A side that runs out of time loses.
+    """
+    if seed is not None:
+        random.seed(seed)
+    clocks = {color: TimeManager(*clock) for color in (RED, BLUE)} if clock else None
+    board = Board()
+    turn = first_turn
+    cpu_time = {RED: 0.0, BLUE: 0.0}
+    moves = {RED: 0, BLUE: 0}
+    played = []
+    winner = None
+    termination = 'ply limit'
+    plies = 0
+
+    while plies < max_plies:
+        winner = board.get_winner()
+        if winner is not None or board.is_draw():
+            break
+        config = red_config if turn == RED else blue_config
+        start = time.process_time()
+        searcher = make_searcher(config, copy.deepcopy(board), turn)
+        if clocks:
+            wall_start = time.perf_counter()
+            budget = clocks[turn].allocate(board, len(board.legal_moves(turn)))
+            searcher.iterations = 10 ** 9  # The clock is the only limit
+            searcher.time_limit = budget
+            move = searcher.search()
+            clocks[turn].record(time.perf_counter() - wall_start, budget, searcher.last_search_stats)
+        else:
+            move = searcher.search()
+        cpu_time[turn] += time.process_time() - start
+        if clocks and clocks[turn].flagged:
+            winner = BLUE if turn == RED else RED
+            termination = 'time forfeit'
+            break
+        if not move:
+            winner = BLUE if turn == RED else RED
+            break
+        board.make_move(move)
+        played.append(move)
+        moves[turn] += 1
+        plies += 1
+        turn = BLUE if turn == RED else RED
+    else:
+        winner = board.get_winner()
+
+    if termination == 'ply limit':
+        termination = 'win' if winner is not None else (board.draw_reason() or termination)
+
+    return {
+        'winner': winner,
+        'termination': termination,
+        'plies': plies,
+        'moves': played,  # Encoded moves, for archive_game()
+        'first_turn': first_turn,
+        'seed': seed,
+        'cpu_red': cpu_time[RED],
+        'cpu_blue': cpu_time[BLUE],
+        'moves_red': moves[RED],
+        'moves_blue': moves[BLUE],
+    }
+
+
+def archive_game(archive, red_config, blue_config, result):
+    """Append a play_game() result to a PdnArchive (checkers/pdn.py)."""
+    tags = {
+        'Event': 'Headless match',
+        'White': config_name(red_config),
+        'Black': config_name(blue_config),
+        'WhiteConfig': json.dumps(red_config, sort_keys=True),
+        'BlackConfig': json.dumps(blue_config, sort_keys=True),
+    }
+    if result['seed'] is not None:
+        tags['Seed'] = result['seed']
+    final_tags = {
+        'Termination': result['termination'],
+        'Plies': result['plies'],
+        'WhiteCPU': f"{result['cpu_red']:.3f}",
+        'BlackCPU': f"{result['cpu_blue']:.3f}",
+    }
+    unfinished = result['winner'] is None and result['termination'] == 'ply limit'
+    archive.write_game(tags, result['moves'], result['winner'], UNFINISHED if unfinished else None, final_tags,
+                       turn=result['first_turn'])
+
+
+def score_for(result, color):
+    """1.0 / 0.5 / 0.0 from the point of view of color."""
+    if result['winner'] is None:
+        return 0.5
+    return 1.0 if result['winner'] == color else 0.0
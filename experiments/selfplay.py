@@ -0,0 +1,245 @@
+"""Self-play training data in memory-mapped NumPy shards.
+
+    python -m experiments.selfplay --games 500 --red MCTS --blue MCTSMaterialHeuristic \\
+        --iterations 300 --output data/selfplay
+
+Games are played headlessly by a process pool. The parent process writes one
+record per searched position:
+- the feature planes from mcts/features.py;
+- the side to move;
+- the root visit distribution;
+- the final outcome for the side to move (1 win, 0 draw, -1 loss).
+The first --random-plies plies are random moves, for variety. They and any
+forced moves are not recorded.
+
+Records go to fixed-size shards (shard-00000.npy, ... of RECORD_DTYPE) written
+through np.lib.format.open_memmap. The policy is sparse: the MAX_POLICY_MOVES
+most visited root moves as canonical from * 50 + to indices (-1 pads) with
+their visit shares. index.json lists the shards and their record counts. It is
+rewritten after every shard, so a run can be stopped at any time, and a later
+run with the same --output appends.
+
+ShardDataset memory-maps the shards and streams random minibatches:
+
+    dataset = ShardDataset('data/selfplay')
+    for batch in dataset.minibatches(256, np.random.default_rng(0)):
+        batch['planes'], batch['policy'], batch['outcome'] ...
+"""
+import argparse
+import copy
+import json
+import os
+import random
+from multiprocessing import Pool
+import numpy as np
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from checkers.moves import SQUARES
+from experiments.match import SEARCHERS, make_searcher, MAX_PLIES
+from mcts.features import PLANES, encode_planes, canonical_move
+from mcts.stepper import SearchStepper
+
+MAX_POLICY_MOVES = 48
+RECORD_DTYPE = np.dtype([
+    ('planes', np.uint8, (PLANES, SQUARES)),
+    ('turn', np.int8),  # 0 BLUE, 1 RED
+    ('policy_moves', np.int16, (MAX_POLICY_MOVES,)),
+    ('policy', np.float16, (MAX_POLICY_MOVES,)),
+    ('outcome', np.int8),
+    ('game', np.int32),
+    ('ply', np.int16),
+])
+INDEX_FILE = 'index.json'
+
+
+def play_selfplay_game(args):
+    """Play one game; returns (records as a RECORD_DTYPE array, winner)."""
+    red_config, blue_config, first_turn, random_plies, seed = args
+    random.seed(seed)
+    board = Board()
+    turn = first_turn
+    positions = []  # (planes, turn, ply, policy moves, policy)
+    winner = None
+    for ply in range(MAX_PLIES):
+        winner = board.get_winner()
+        if winner is not None or board.is_draw():
+            break
+        moves = board.legal_moves(turn)
+        if ply < random_plies:
+            board.make_move(random.choice(moves))
+            turn = BLUE if turn == RED else RED
+            continue
+        searcher = make_searcher(red_config if turn == RED else blue_config, copy.deepcopy(board), turn)
+        stepper = SearchStepper(searcher)
+        while not stepper.step(64):
+            pass
+        move = stepper.best_move()
+        children = sorted(stepper.root.children, key=lambda c: c.visits, reverse=True)[:MAX_POLICY_MOVES]
+        total = sum(child.visits for child in children)
+        if len(moves) > 1 and total:
+            positions.append((encode_planes(board, turn), turn, ply,
+                              [canonical_move(child.move, turn) for child in children],
+                              [child.visits / total for child in children]))
+        board.make_move(move)
+        turn = BLUE if turn == RED else RED
+
+    records = np.zeros(len(positions), dtype=RECORD_DTYPE)
+    records['policy_moves'] = -1
+    for i, (planes, mover, ply, policy_moves, policy) in enumerate(positions):
+        records['planes'][i] = planes
+        records['turn'][i] = mover == RED
+        records['policy_moves'][i, :len(policy_moves)] = policy_moves
+        records['policy'][i, :len(policy)] = policy
+        records['outcome'][i] = 0 if winner is None else (1 if winner == mover else -1)
+        records['ply'][i] = ply
+    return records, winner
+
+
+class ShardWriter:
+    """Appends records to fixed-size memory-mapped shards in directory and keeps index.json current."""
+    def __init__(self, directory, shard_size):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.index = _read_index(directory) or {'dtype': str(RECORD_DTYPE.descr), 'shard_size': shard_size,
+                                                'games': 0, 'shards': []}
+        self.shard_size = self.index['shard_size']
+        self.shard = None
+        self.count = 0
+        shards = self.index['shards']
+        if shards and shards[-1]['count'] < self.shard_size:
+            # Continue the last, partly filled shard
+            self.count = shards[-1]['count']
+            self.shard = np.load(os.path.join(directory, shards[-1]['file']), mmap_mode='r+')
+
+    def write(self, records):
+        """Append one game's records, numbering the game after those already in the directory."""
+        records['game'] = self.index['games']
+        self.index['games'] += 1
+        start = 0
+        while start < len(records):
+            if self.shard is None or self.count == self.shard_size:
+                self._new_shard()
+            n = min(len(records) - start, self.shard_size - self.count)
+            self.shard[self.count:self.count + n] = records[start:start + n]
+            self.count += n
+            start += n
+            self.index['shards'][-1]['count'] = self.count
+            if self.count == self.shard_size:
+                self.shard.flush()
+                self._write_index()
+
+    def close(self):
+        if self.shard is not None:
+            self.shard.flush()
+        self._write_index()
+
+    def _new_shard(self):
+        if self.shard is not None:
+            self.shard.flush()
+        name = f"shard-{len(self.index['shards']):05d}.npy"
+        self.shard = np.lib.format.open_memmap(os.path.join(self.directory, name), mode='w+',
+                                               dtype=RECORD_DTYPE, shape=(self.shard_size,))
+        self.count = 0
+        self.index['shards'].append({'file': name, 'count': 0})
+        self._write_index()
+
+    def _write_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+
+def _read_index(directory):
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class ShardDataset:
+    """Read-only view of a shard directory; nothing is loaded until a minibatch asks for it."""
+    def __init__(self, directory):
+        index = _read_index(directory)
+        if index is None:
+            raise ValueError(f"No {INDEX_FILE} in {directory}")
+        shards = [shard for shard in index['shards'] if shard['count']]
+        self.shards = [np.load(os.path.join(directory, shard['file']), mmap_mode='r') for shard in shards]
+        self.counts = np.array([shard['count'] for shard in shards], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def get(self, indices):
+        """Records at global indices, as a RECORD_DTYPE array in the order given."""
+        indices = np.asarray(indices, dtype=np.int64)
+        shard_ids = np.searchsorted(self.offsets, indices, side='right') - 1
+        batch = np.empty(len(indices), dtype=RECORD_DTYPE)
+        for shard_id in np.unique(shard_ids):
+            mask = shard_ids == shard_id
+            local = indices[mask] - self.offsets[shard_id]
+            order = np.argsort(local)  # Sequential reads within the shard
+            rows = np.empty(len(local), dtype=RECORD_DTYPE)
+            rows[order] = self.shards[shard_id][local[order]]
+            batch[mask] = rows
+        return batch
+
+    def minibatches(self, batch_size, rng, batches=None):
+        """Yield batches of records sampled uniformly with replacement; forever if batches is None."""
+        produced = 0
+        while batches is None or produced < batches:
+            yield self.get(rng.integers(len(self), size=batch_size))
+            produced += 1
+
+    def policy_targets(self, batch):
+        """Dense (len(batch), 2500) float32 visit distributions of a batch."""
+        dense = np.zeros((len(batch), SQUARES * SQUARES), dtype=np.float32)
+        rows, slots = np.nonzero(batch['policy_moves'] >= 0)
+        dense[rows, batch['policy_moves'][rows, slots]] = batch['policy'][rows, slots]
+        return dense
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--red', choices=sorted(SEARCHERS), default='MCTS')
+    parser.add_argument('--blue', choices=sorted(SEARCHERS), default='MCTS')
+    parser.add_argument('--config', help='JSON file with [red configuration, blue configuration]; overrides --red/--blue')
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--random-plies', type=int, default=4, help='random opening plies, not recorded')
+    parser.add_argument('--shard-size', type=int, default=65536, help='records per shard')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='selfplay')
+    args = parser.parse_args()
+
+    if args.config:
+        with open(args.config) as f:
+            red_config, blue_config = json.load(f)
+    else:
+        red_config = {'class': args.red, 'iterations': args.iterations}
+        blue_config = {'class': args.blue, 'iterations': args.iterations}
+
+    writer = ShardWriter(args.output, args.shard_size)
+    jobs = [(red_config, blue_config, BLUE if game % 2 == 0 else RED, args.random_plies, args.seed + game)
+            for game in range(args.games)]
+    results = {RED: 0, BLUE: 0, None: 0}
+    records_written = 0
+    try:
+        with Pool(args.workers) as pool:
+            for game, (records, winner) in enumerate(pool.imap_unordered(play_selfplay_game, jobs), 1):
+                writer.write(records)
+                records_written += len(records)
+                results[winner] += 1
+                print(f"[{game}/{args.games}] {len(records)} positions, "
+                      f"{'draw' if winner is None else ('RED' if winner == RED else 'BLUE') + ' won'}")
+    finally:
+        writer.close()
+    print(f"RED {results[RED]}, BLUE {results[BLUE]}, draws {results[None]}; "
+          f"{records_written} positions written to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
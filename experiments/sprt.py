@@ -0,0 +1,87 @@
+import math
+
+# 97.5% normal quantile, for two-sided 95% intervals
+Z_95 = 1.959964
+
+
+def elo_to_score(elo):
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def score_to_elo(score):
+    score = min(max(score, 1e-6), 1.0 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+class SPRT:
+    """Sequential probability ratio test on game results of the first engine.
+
+    H0: the Elo difference is elo0, H1: it is elo1. Uses the generalized SPRT
+    approximation for win/draw/loss results (as in cutechess-cli and fishtest).
+    """
+    def __init__(self, elo0=0.0, elo1=50.0, alpha=0.05, beta=0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        self.lower_bound = math.log(beta / (1.0 - alpha))
+        self.upper_bound = math.log((1.0 - beta) / alpha)
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def record(self, score):
+        """Add one game: 1.0 win, 0.5 draw, 0.0 loss for the first engine."""
+        if score == 1.0:
+            self.wins += 1
+        elif score == 0.0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def _score_and_variance(self):
+        n = self.games
+        score = (self.wins + 0.5 * self.draws) / n
+        variance = (self.wins * (1.0 - score) ** 2 + self.draws * (0.5 - score) ** 2
+                    + self.losses * score ** 2) / n
+        return score, variance
+
+    def llr(self):
+        if self.games == 0:
+            return 0.0
+        score, variance = self._score_and_variance()
+        if variance <= 0.0:
+            # All results identical so far; fall back to the largest per-game variance
+            variance = 0.25
+        s0 = elo_to_score(self.elo0)
+        s1 = elo_to_score(self.elo1)
+        return (s1 - s0) * (2.0 * score - s0 - s1) * self.games / (2.0 * variance)
+
+    def status(self):
+        """'H1' (accept elo1), 'H0' (accept elo0) or None while undecided."""
+        llr = self.llr()
+        if llr >= self.upper_bound:
+            return 'H1'
+        if llr <= self.lower_bound:
+            return 'H0'
+        return None
+
+    def elo_interval(self):
+        """(elo, low, high) estimate with a 95% confidence interval."""
+        if self.games == 0:
+            return 0.0, float('-inf'), float('inf')
+        score, variance = self._score_and_variance()
+        margin = Z_95 * math.sqrt(variance / self.games)
+        return score_to_elo(score), score_to_elo(score - margin), score_to_elo(score + margin)
+
+    def summary(self):
+        elo, low, high = self.elo_interval()
+        status = self.status()
+        verdict = {'H1': f"H1 accepted (elo >= {self.elo1:g})", 'H0': f"H0 accepted (elo <= {self.elo0:g})"}.get(status, 'undecided')
+        return (f"SPRT [{self.elo0:g}, {self.elo1:g}] W/D/L {self.wins}/{self.draws}/{self.losses}: "
+                f"LLR {self.llr():.2f} ({self.lower_bound:.2f}, {self.upper_bound:.2f}), "
+                f"Elo {elo:.1f} [{low:.1f}, {high:.1f}], {verdict}")
@@ -0,0 +1,159 @@
+"""SPSA tuner for searcher constants at a fixed per-move time budget.
+
+    python -m experiments.spsa --searcher MCTSPROGRESSIVE --time-per-move 0.05 --iterations 500
+    python -m experiments.spsa --resume --checkpoint spsa_checkpoint.json
+
+Each SPSA iteration perturbs every parameter by +/- c_k at random, plays
+--pairs-per-iteration game pairs (colours swapped) between the two perturbed
+configurations in parallel, and steps along the measured score difference.
+The state is checkpointed after every iteration so long runs can be resumed.
+Parameters can be given as a JSON file with --params:
+
+    {"k": {"start": 1.0, "min": 0.1, "max": 4.0, "c_end": 0.2, "r_end": 0.002}}
+
+c_end is the final perturbation size and r_end the final learning rate; the
+schedule follows the usual engine-tuning SPSA setup (alpha 0.602, gamma 0.101).
+"""
+import argparse
+import json
+import math
+import os
+import random
+from multiprocessing import Pool
+from checkers.constants import RED, BLUE
+from experiments.match import SEARCHERS, play_game, score_for
+
+ALPHA = 0.602
+GAMMA = 0.101
+INTEGER_PARAMS = {'max_simulation_steps'}
+
+_EXPLORATION = {'start': math.sqrt(2), 'min': 0.05, 'max': 4.0, 'c_end': 0.2, 'r_end': 0.002}
+_ROLLOUT = {'start': 30, 'min': 0, 'max': 120, 'c_end': 4, 'r_end': 0.002}
+DEFAULT_PARAMS = {
+    'MCTS': {'exploration': _EXPLORATION, 'max_simulation_steps': _ROLLOUT},
+    'MCTSPROGRESSIVE': {
+        'k': {'start': 1.0, 'min': 0.1, 'max': 4.0, 'c_end': 0.2, 'r_end': 0.002},
+        'alpha': {'start': 0.5, 'min': 0.1, 'max': 0.95, 'c_end': 0.05, 'r_end': 0.002},
+        'exploration': _EXPLORATION,
+        'max_simulation_steps': _ROLLOUT,
+    },
+    'MCTSHEURISTIC': {
+        'center_weight': {'start': 0.3, 'min': 0.0, 'max': 5.0, 'c_end': 0.1, 'r_end': 0.002},
+        'sigmoid_k': {'start': 1.0, 'min': 0.1, 'max': 10.0, 'c_end': 0.2, 'r_end': 0.002},
+        'exploration': _EXPLORATION,
+        'max_simulation_steps': _ROLLOUT,
+    },
+    'MCTSMaterialHeuristic': {
+        'material_weight': {'start': 0.5, 'min': 0.05, 'max': 5.0, 'c_end': 0.1, 'r_end': 0.002},
+        'king_value': {'start': 10.0, 'min': 1.0, 'max': 30.0, 'c_end': 1.0, 'r_end': 0.002},
+        'sigmoid_k': {'start': 1.0, 'min': 0.1, 'max': 10.0, 'c_end': 0.2, 'r_end': 0.002},
+        'exploration': _EXPLORATION,
+        'max_simulation_steps': _ROLLOUT,
+    },
+}
+
+
+def clip(name, spec, value):
+    value = min(max(value, spec['min']), spec['max'])
+    return int(round(value)) if name in INTEGER_PARAMS else value
+
+
+def _run_pair_game(args):
+    plus_config, minus_config, plus_color, first_turn, seed = args
+    red, blue = (plus_config, minus_config) if plus_color == RED else (minus_config, plus_config)
+    result = play_game(red, blue, first_turn, seed)
+    return score_for(result, plus_color)
+
+
+def save_checkpoint(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--searcher', choices=sorted(SEARCHERS), default='MCTSPROGRESSIVE')
+    parser.add_argument('--params', help='JSON file with the parameters to tune (default: built-in set)')
+    parser.add_argument('--time-per-move', type=float, default=0.05, help='search budget per move in seconds')
+    parser.add_argument('--iterations', type=int, default=500, help='number of SPSA iterations')
+    parser.add_argument('--pairs-per-iteration', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint', default='spsa_checkpoint.json')
+    parser.add_argument('--resume', action='store_true', help='continue from --checkpoint')
+    args = parser.parse_args()
+
+    if args.resume:
+        with open(args.checkpoint) as f:
+            state = json.load(f)
+        print(f"Resuming at iteration {state['iteration']}/{state['iterations']}")
+    else:
+        if args.params:
+            with open(args.params) as f:
+                specs = json.load(f)
+        else:
+            specs = DEFAULT_PARAMS[args.searcher]
+        state = {
+            'searcher': args.searcher,
+            'time_per_move': args.time_per_move,
+            'iterations': args.iterations,
+            'pairs_per_iteration': args.pairs_per_iteration,
+            'seed': args.seed,
+            'specs': specs,
+            'theta': {name: float(spec['start']) for name, spec in specs.items()},
+            'iteration': 0,
+            'history': [],
+        }
+
+    specs = state['specs']
+    total = state['iterations']
+    stability = 0.1 * total  # The "A" constant of the SPSA schedule
+    base_config = {
+        'class': state['searcher'],
+        'iterations': 10 ** 9,  # The time budget is the only limit
+        'time_limit': state['time_per_move'],
+    }
+
+    with Pool(args.workers) as pool:
+        while state['iteration'] < total:
+            k = state['iteration']
+            rng = random.Random(state['seed'] * 1000003 + k)
+            theta = state['theta']
+            plus, minus, deltas, c_k = {}, {}, {}, {}
+            for name, spec in specs.items():
+                c_k[name] = spec['c_end'] * total ** GAMMA / (k + 1) ** GAMMA
+                deltas[name] = rng.choice((-1, 1))
+                plus[name] = clip(name, spec, theta[name] + c_k[name] * deltas[name])
+                minus[name] = clip(name, spec, theta[name] - c_k[name] * deltas[name])
+
+            plus_config = dict(base_config, **plus)
+            minus_config = dict(base_config, **minus)
+            jobs = []
+            for pair in range(state['pairs_per_iteration']):
+                first_turn = BLUE if pair % 2 == 0 else RED
+                for plus_color in (RED, BLUE):
+                    jobs.append((plus_config, minus_config, plus_color, first_turn, rng.getrandbits(32)))
+            scores = pool.map(_run_pair_game, jobs)
+            # Wins minus losses of the "plus" side over the batch
+            result = sum(2.0 * score - 1.0 for score in scores)
+
+            for name, spec in specs.items():
+                a_end = spec['r_end'] * spec['c_end'] ** 2
+                a_k = a_end * (stability + total) ** ALPHA / (stability + k + 1) ** ALPHA
+                step = a_k / c_k[name] * result * deltas[name]
+                theta[name] = min(max(theta[name] + step, spec['min']), spec['max'])
+
+            state['iteration'] = k + 1
+            state['history'].append({'iteration': k + 1, 'result': result, 'theta': dict(theta)})
+            save_checkpoint(args.checkpoint, state)
+            values = ', '.join(f"{name}={value:.4g}" for name, value in theta.items())
+            print(f"[{k + 1}/{total}] plus-minus score {result:+.0f}: {values}")
+
+    final = {name: clip(name, specs[name], value) for name, value in state['theta'].items()}
+    print(f"\nTuned {state['searcher']} parameters: {json.dumps(final)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,13 +7,28 @@ import queue
 import copy
 import logging
 import csv
+import json
 import os
 from checkers.board import Board
-from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, RED, BLUE, ROWS, COLS
+from checkers.view import BoardView
+from checkers.snapshot import Snapshot
+from checkers.channel import GameChannel
+from checkers.pdn import PdnArchive, UNFINISHED
+from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, RED, BLUE
+from checkers.moves import capture_count, move_promotes, move_coords, move_to_str
 from mcts.mcts import MCTS
 from mcts.hueristics import MCTSHEURISTIC  # Fixed typo from 'hueristics'
 from mcts.progressive_widening import MCTSPROGRESSIVE
 from mcts.heuristics_material import MCTSMaterialHeuristic
+from mcts.opening_book import OpeningBook
+from mcts.cache import EVALUATION_CACHE, MOVE_CACHE
+from mcts.time_manager import TimeManager
+from mcts.ponder import Ponderer
+from mcts.stepper import search_async
+from config import (OPENING_BOOK_PATH, SPRT_ELO0, SPRT_ELO1, SPRT_ALPHA, SPRT_BETA, SPRT_MAX_GAMES,
+                    GAME_CLOCK_SECONDS, GAME_CLOCK_INCREMENT, ROOT_POLICY, PONDER, PONDER_MAX_ITERATIONS,
+                    GAME_ARCHIVE_PATH)
+from experiments.sprt import SPRT
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -95,9 +110,106 @@ def get_row_col_from_mouse(pos):
     col = x // SQUARE_SIZE
     return row, col
 
-def game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event, win_queue, initial_turn, metrics_queue):
+# Posted by the engine thread after every published snapshot so the GUI sleeps in pygame.event.wait()
+SNAPSHOT_EVENT = pygame.USEREVENT + 1
+EVENT_WAIT_MS = 250  # Upper bound on a GUI wait, so a stopped game is noticed without a snapshot
+
+def wake_gui():
+    try:
+        pygame.event.post(pygame.event.Event(SNAPSHOT_EVENT))
+    except pygame.error:
+        pass  # Event queue full or display gone; the GUI will wake up anyway
+
+async def wait_events(fps):
+    """Pygame events, blocking until there is one (on Emscripten, yield to the browser instead)."""
+    if platform.system() == "Emscripten":
+        await asyncio.sleep(1.0 / fps)
+        return pygame.event.get()
+    return [pygame.event.wait(EVENT_WAIT_MS)] + pygame.event.get()
+
+PVAI_SEARCHERS = {'mcts': MCTS, 'ai2': MCTSHEURISTIC, 'ai3': MCTSPROGRESSIVE, 'material': MCTSMaterialHeuristic}
+PONDER_SLICE_SECONDS = 0.02  # Pondering time between checks for the human's move
+SEARCH_SLICE_ITERATIONS = 8  # Search iterations between yields to the event loop (mcts/stepper.py)
+
+def load_opening_book():
+    if not OPENING_BOOK_PATH or not os.path.exists(OPENING_BOOK_PATH):
+        return None
+    try:
+        return OpeningBook(OPENING_BOOK_PATH)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Opening book not loaded: {str(e)}")
+        return None
+
+async def choose_ai_move(ai_class, board, turn, iterations, opening_book, clock, reuse_root=None, cancel_event=None):
+    """Book move if there is one, otherwise search; the time used is charged to the side's clock.
+
+    reuse_root is a tree for this position kept from pondering; the search continues from it.
+    The search yields to the event loop between slices and stops early once cancel_event is set.
+    """
+    start = time.perf_counter()
+    budget = 0.0
+    stats = None
+    move = opening_book.choose_move(board, turn) if opening_book else None
+    if move:
+        logging.debug(f"Book move for {'BLUE' if turn == BLUE else 'RED'}")
+    else:
+        mcts = ai_class(copy.deepcopy(board), turn, iterations=iterations)
+        mcts.root_policy = ROOT_POLICY
+        mcts.reuse_root = reuse_root
+        if clock:
+            budget = clock.allocate(board, len(board.legal_moves(turn)))
+            mcts.iterations = 10 ** 9  # The clock is the only limit
+            mcts.time_limit = budget
+        move = await search_async(mcts, SEARCH_SLICE_ITERATIONS, cancel_event)
+        stats = mcts.last_search_stats
+        logging.debug(f"Search stats: {stats}")
+    if clock:
+        clock.record(time.perf_counter() - start, budget, stats)
+        logging.debug(f"{'BLUE' if turn == BLUE else 'RED'} clock: {clock.remaining:.2f}s left, {clock.bank:.2f}s banked")
+    return move
+
+def start_game_record(mode, ai_player, ai_red, ai_blue, iterations, turn):
+    """Open the PDN record of a game in GAME_ARCHIVE_PATH, or None when recording is off."""
+    if not GAME_ARCHIVE_PATH:
+        return None
+    if mode == 'aivai':
+        players = {RED: ai_red, BLUE: ai_blue}
+    else:
+        players = {RED: None, BLUE: None}
+        if ai_player:
+            players[ai_player] = PVAI_SEARCHERS.get(mode)
+    tags = {'Event': {'aivai': 'AI vs AI', 'pvp': 'Player vs Player'}.get(mode, 'Player vs AI')}
+    for color, side in ((RED, 'White'), (BLUE, 'Black')):
+        ai_class = players[color]
+        tags[side] = ai_class.__name__ if ai_class else 'Human'
+        if ai_class:
+            tags[f'{side}Config'] = json.dumps({'class': ai_class.__name__, 'iterations': iterations, 'root_policy': ROOT_POLICY})
+    if GAME_CLOCK_SECONDS:
+        tags['TimeControl'] = f"{GAME_CLOCK_SECONDS}+{GAME_CLOCK_INCREMENT}"
+    try:
+        return PdnArchive(GAME_ARCHIVE_PATH).start_game(tags, turn=turn)
+    except OSError as e:
+        logging.warning(f"Game not recorded: {str(e)}")
+        return None
+
+async def game_logic(board, mode, ai_player, ai_red, ai_blue, channel, stop_event, win_queue, initial_turn, metrics_queue):
+    """Engine side of a game: owns board and publishes a Snapshot to channel after every move.
+
+    Runs with asyncio.run() in its own thread, or as a task on the GUI's event loop on
+    Emscripten; it never blocks the loop for longer than a search slice.
+    """
     turn = initial_turn
+    opening_book = load_opening_book()
     iterations = 30 if mode != 'aivai' else 15
+    clocks = None
+    if GAME_CLOCK_SECONDS:
+        clocks = {color: TimeManager(GAME_CLOCK_SECONDS, GAME_CLOCK_INCREMENT) for color in (RED, BLUE)}
+    flag_winner = None
+    ponderer = None
+    reuse_root = None
+    record = start_game_record(mode, ai_player, ai_red, ai_blue, iterations, turn)
+    think_time = {RED: 0.0, BLUE: 0.0}  # Seconds spent choosing AI moves, for the record
+    channel.publish(Snapshot.from_board(board, turn))
     move_count = 0
     captures_red = 0
     captures_blue = 0
@@ -105,25 +217,13 @@ def game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event,
     promotions_blue = 0
 
     while not stop_event.is_set():
-        winner = board.get_winner()
+        winner = flag_winner or board.get_winner()
         if winner is not None:
             # Calculate piece and king differences
-            red_pieces = 0
-            blue_pieces = 0
-            red_kings = 0
-            blue_kings = 0
-            for row in range(ROWS):
-                for col in range(COLS):
-                    piece = board.get_piece(row, col)
-                    if piece != 0:
-                        if piece.color == RED:
-                            red_pieces += 1
-                            if piece.king:
-                                red_kings += 1
-                        else:
-                            blue_pieces += 1
-                            if piece.king:
-                                blue_kings += 1
+            red_pieces = board.piece_count(RED)
+            blue_pieces = board.piece_count(BLUE)
+            red_kings = board.kings[RED]
+            blue_kings = board.kings[BLUE]
             piece_diff = red_pieces - blue_pieces if winner == RED else blue_pieces - red_pieces
             king_diff = red_kings - blue_kings if winner == RED else blue_kings - red_kings
             
@@ -134,6 +234,8 @@ def game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event,
                 f"capturing {captures_red if winner == RED else captures_blue} piece{'s' if (captures_red if winner == RED else captures_blue) != 1 else ''} "
                 f"and promoting {promotions_red if winner == RED else promotions_blue} pawn{'s' if (promotions_red if winner == RED else promotions_blue) != 1 else ''}"
             )
+            if flag_winner:
+                outcome_desc += f" ({'BLUE' if winner == RED else 'RED'} ran out of time)"
             
             metrics = {
                 'winner': winner,
@@ -148,51 +250,64 @@ def game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event,
             }
             metrics_queue.put(metrics)
             logging.debug(f"Game ended with winner: {'RED' if winner == RED else 'BLUE'}")
+            logging.debug(f"Evaluation cache: {EVALUATION_CACHE.stats()}, move cache: {MOVE_CACHE.stats()}")
             win_queue.put(winner)
             stop_event.set()
             break
 
+        draw_reason = board.draw_reason()
+        if draw_reason:
+            # Reported through metrics only; an empty win_queue means no winner
+            metrics_queue.put({
+                'winner': None,
+                'piece_diff': 0,
+                'king_diff': 0,
+                'move_count': move_count,
+                'captures_red': captures_red,
+                'captures_blue': captures_blue,
+                'promotions_red': promotions_red,
+                'promotions_blue': promotions_blue,
+                'outcome_desc': (
+                    f"Draw by {draw_reason} after {move_count} moves, "
+                    f"with RED capturing {captures_red} and BLUE capturing {captures_blue} pieces"
+                )
+            })
+            logging.debug(f"Game drawn: {draw_reason}")
+            stop_event.set()
+            break
+
         if mode == 'aivai':
             current_ai = ai_blue if turn == BLUE else ai_red
             try:
-                mcts = current_ai(copy.deepcopy(board), turn, iterations=iterations)
-                move = mcts.search()
+                started = time.perf_counter()
+                move = await choose_ai_move(current_ai, board, turn, iterations, opening_book, clocks and clocks[turn],
+                                            cancel_event=stop_event)
+                think_time[turn] += time.perf_counter() - started
+                if clocks and clocks[turn].flagged:
+                    logging.info(f"{'BLUE' if turn == BLUE else 'RED'} ran out of time")
+                    flag_winner = RED if turn == BLUE else BLUE
+                    continue
                 if move:
-                    piece, dest_row, dest_col = move
-                    new_piece = board.get_piece(piece.row, piece.col)
-                    if new_piece == 0 or new_piece.color != turn:
-                        logging.error(f"Invalid AI move: {move} for player {'BLUE' if turn == BLUE else 'RED'}")
+                    if move not in board.legal_moves(turn):
+                        logging.error(f"Invalid AI move: {move_to_str(move)} for player {'BLUE' if turn == BLUE else 'RED'}")
                         stop_event.set()
                         break
+                    if record:
+                        record.add_move(move, board)
                     # Check for promotion and captures
-                    was_king = new_piece.king
-                    _, captured, _ = board.valid_move(new_piece, dest_row, dest_col)
-                    result = board.move(new_piece, dest_row, dest_col)
+                    board.make_move(move)
                     move_count += 1
-                    if captured:
-                        if turn == RED:
-                            captures_red += len(captured)
-                        else:
-                            captures_blue += len(captured)
-                    if not was_king and new_piece.king:
-                        if turn == RED:
-                            promotions_red += 1
-                        else:
-                            promotions_blue += 1
-                    logging.debug(f"AI move: {piece.row},{piece.col} to {dest_row},{dest_col}")
-                    move_queue.put((piece.row, piece.col, dest_row, dest_col))
+                    if turn == RED:
+                        captures_red += capture_count(move)
+                        promotions_red += move_promotes(move)
+                    else:
+                        captures_blue += capture_count(move)
+                        promotions_blue += move_promotes(move)
+                    logging.debug(f"AI move: {move_to_str(move)}")
                     turn = RED if turn == BLUE else BLUE
+                    channel.publish(Snapshot.from_board(board, turn, move, move_count))
                 else:
-                    has_moves = False
-                    for row in range(ROWS):
-                        for col in range(COLS):
-                            piece = board.get_piece(row, col)
-                            if piece != 0 and piece.color == turn:
-                                if board.can_move(piece):
-                                    has_moves = True
-                                    break
-                        if has_moves:
-                            break
+                    has_moves = board.has_moves(turn)
                     if not has_moves:
                         logging.info(f"No valid moves for {'BLUE' if turn == BLUE else 'RED'}")
                         winner = BLUE if turn == RED else RED
@@ -223,48 +338,40 @@ def game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event,
                 stop_event.set()
         elif ai_player and turn == ai_player:
             try:
-                if mode == 'mcts':
-                    mcts = MCTS(copy.deepcopy(board), ai_player, iterations=iterations)
-                elif mode == 'ai2':
-                    mcts = MCTSHEURISTIC(copy.deepcopy(board), ai_player, iterations=iterations)
-                elif mode == 'ai3':
-                    mcts = MCTSPROGRESSIVE(copy.deepcopy(board), ai_player, iterations=iterations)
-                elif mode == 'material':
-                    mcts = MCTSMaterialHeuristic(copy.deepcopy(board), ai_player, iterations=iterations)
-                else:
+                ai_class = PVAI_SEARCHERS.get(mode)
+                if ai_class is None:
                     logging.error(f"Invalid mode: {mode}")
                     stop_event.set()
                     break
-                move = mcts.search()
+                started = time.perf_counter()
+                move = await choose_ai_move(ai_class, board, ai_player, iterations, opening_book, clocks and clocks[ai_player],
+                                            reuse_root, stop_event)
+                think_time[ai_player] += time.perf_counter() - started
+                reuse_root = None
+                if clocks and clocks[ai_player].flagged:
+                    logging.info(f"AI {'RED' if ai_player == RED else 'BLUE'} ran out of time")
+                    flag_winner = BLUE if ai_player == RED else RED
+                    continue
                 if move:
-                    piece, dest_row, dest_col = move
-                    new_piece = board.get_piece(piece.row, piece.col)
-                    if new_piece == 0 or new_piece.color != ai_player:
-                        logging.error(f"Invalid AI move: {move} for player {'RED' if ai_player == RED else 'BLUE'}")
+                    if move not in board.legal_moves(ai_player):
+                        logging.error(f"Invalid AI move: {move_to_str(move)} for player {'RED' if ai_player == RED else 'BLUE'}")
                         stop_event.set()
                         break
-                    was_king = new_piece.king
-                    _, captured, _ = board.valid_move(new_piece, dest_row, dest_col)
-                    result = board.move(new_piece, dest_row, dest_col)
+                    if record:
+                        record.add_move(move, board)
+                    board.make_move(move)
                     move_count += 1
-                    if captured:
-                        captures_red += len(captured)
-                    if not was_king and new_piece.king:
-                        promotions_red += 1
-                    logging.debug(f"AI move: {piece.row},{piece.col} to {dest_row},{dest_col}")
-                    move_queue.put((piece.row, piece.col, dest_row, dest_col))
-                    turn = BLUE
+                    if ai_player == RED:
+                        captures_red += capture_count(move)
+                        promotions_red += move_promotes(move)
+                    else:
+                        captures_blue += capture_count(move)
+                        promotions_blue += move_promotes(move)
+                    logging.debug(f"AI move: {move_to_str(move)}")
+                    turn = BLUE if ai_player == RED else RED
+                    channel.publish(Snapshot.from_board(board, turn, move, move_count))
                 else:
-                    has_moves = False
-                    for row in range(ROWS):
-                        for col in range(COLS):
-                            piece = board.get_piece(row, col)
-                            if piece != 0 and piece.color == ai_player:
-                                if board.can_move(piece):
-                                    has_moves = True
-                                    break
-                        if has_moves:
-                            break
+                    has_moves = board.has_moves(ai_player)
                     if not has_moves:
                         logging.info(f"No valid moves for AI {'RED' if ai_player == RED else 'BLUE'}")
                         outcome_desc = (
@@ -292,10 +399,58 @@ def game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event,
             except Exception as e:
                 logging.error(f"AI exception in Player vs AI: {str(e)}")
                 stop_event.set()
-        elif mode != 'aivai':
-            time.sleep(0.01)
         else:
-            time.sleep(0.01)
+            # Human to move. Against an AI, ponder in short slices between checks for the move;
+            # otherwise, or once pondering is done, sleep until the GUI sends the move
+            if ponderer is None and PONDER and ai_player and mode in PVAI_SEARCHERS:
+                searcher = PVAI_SEARCHERS[mode](board, ai_player, iterations=iterations)
+                ponderer = Ponderer(searcher, board, turn, PONDER_MAX_ITERATIONS)
+            if ponderer is not None and ponderer.step(PONDER_SLICE_SECONDS):
+                received = channel.poll_move()
+                if received is None:
+                    await asyncio.sleep(0)
+                    continue
+            else:
+                received = await channel.next_move()
+                if received is None:
+                    continue  # Woken by the GUI stopping the game
+            ply, move = received
+            if ply != move_count or move not in board.legal_moves(turn):
+                logging.debug(f"Ignoring illegal human move: {move_to_str(move)}")
+                continue
+            if ponderer is not None:
+                reuse_root = ponderer.advance(move)
+                logging.debug(f"Pondered {ponderer.root.visits} iterations, "
+                              f"{reuse_root.visits if reuse_root else 0} kept for the reply")
+                ponderer = None
+            if record:
+                record.add_move(move, board)
+            board.make_move(move)
+            move_count += 1
+            if turn == RED:
+                captures_red += capture_count(move)
+                promotions_red += move_promotes(move)
+            else:
+                captures_blue += capture_count(move)
+                promotions_blue += move_promotes(move)
+            logging.debug(f"Human move: {move_to_str(move)}")
+            turn = RED if turn == BLUE else BLUE
+            channel.publish(Snapshot.from_board(board, turn, move, move_count))
+
+    if record:
+        winner = flag_winner or board.get_winner()
+        draw_reason = board.draw_reason() if winner is None else None
+        if flag_winner:
+            termination = 'time forfeit'
+        else:
+            termination = draw_reason or ('win' if winner is not None else 'abandoned')
+        record.finish(winner, None if winner is not None or draw_reason else UNFINISHED, {
+            'Termination': termination,
+            'Plies': move_count,
+            'WhiteSeconds': f"{think_time[RED]:.2f}",
+            'BlackSeconds': f"{think_time[BLUE]:.2f}",
+        })
+    channel.close()
 
 async def main():
     ai_options = [
@@ -320,12 +475,14 @@ async def main():
         {'text': '10 Games', 'rect': pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, 360, BUTTON_WIDTH, BUTTON_HEIGHT), 'hover': False, 'count': 10},
         {'text': '20 Games', 'rect': pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, 440, BUTTON_WIDTH, BUTTON_HEIGHT), 'hover': False, 'count': 20},
         {'text': '100 Games', 'rect': pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, 520, BUTTON_WIDTH, BUTTON_HEIGHT), 'hover': False, 'count': 100},
+        {'text': 'SPRT', 'rect': pygame.Rect(WIDTH//2 - BUTTON_WIDTH//2, 600, BUTTON_WIDTH, BUTTON_HEIGHT), 'hover': False, 'count': SPRT_MAX_GAMES, 'sprt': True},
     ]
 
     mode = None
     ai_red = None
     ai_blue = None
     num_games = 1
+    use_sprt = False
     selecting_red = False
     selecting_blue = False
     selecting_game_count = False
@@ -368,6 +525,7 @@ async def main():
                     for button in game_count_options:
                         if button['rect'].collidepoint(pos):
                             num_games = button['count']
+                            use_sprt = button.get('sprt', False)
                             selecting_game_count = False
                             mode = 'aivai'
                             break
@@ -391,9 +549,7 @@ async def main():
         await asyncio.sleep(0.016)
 
     board = Board()
-    selected_piece = None
     turn = BLUE
-    valid_moves = set()
     ai_player = RED if mode != 'pvp' else None
 
     # Print player types at the start
@@ -414,7 +570,6 @@ async def main():
 
     FPS = 60
     iterations = 30 if mode != 'aivai' else 15
-    move_queue = queue.Queue()
     win_queue = queue.Queue()
     metrics_queue = queue.Queue()
     stop_event = threading.Event()
@@ -443,6 +598,8 @@ async def main():
             'games': 0
         }
 
+        sprt = SPRT(SPRT_ELO0, SPRT_ELO1, SPRT_ALPHA, SPRT_BETA) if use_sprt else None
+
         # Define CSV filenames based on AI names
         metrics_csv = f"{red_ai_name.replace(' ', '_')}_vs_{blue_ai_name.replace(' ', '_')}_metrics.csv"
         averages_csv = f"{red_ai_name.replace(' ', '_')}_vs_{blue_ai_name.replace(' ', '_')}_averages.csv"
@@ -460,42 +617,35 @@ async def main():
             stop_event.clear()
             print(f"\nStarting Game {game_num}/{num_games} (First move: {'BLUE' if initial_turn == BLUE else 'RED'})")
 
+            # The engine owns board; the GUI only renders the snapshots it publishes
+            channel = GameChannel(notify=wake_gui)
             if platform.system() != "Emscripten":
-                game_thread = threading.Thread(target=game_logic, args=(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event, win_queue, initial_turn, metrics_queue))
+                game_thread = threading.Thread(target=asyncio.run, args=(game_logic(board, mode, ai_player, ai_red, ai_blue, channel, stop_event, win_queue, initial_turn, metrics_queue),))
                 game_thread.daemon = True
                 game_thread.start()
             else:
-                async def async_game_logic():
-                    await game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event, win_queue, initial_turn, metrics_queue)
-                asyncio.create_task(async_game_logic())
-
-            highlighted_move = None
-            while not stop_event.is_set():
-                clock.tick(FPS)
-                board.draw(WIN)
-                if highlighted_move:
-                    board.highlight_moves(WIN, {highlighted_move})
-                pygame.display.update()
-
-                try:
-                    move = move_queue.get_nowait()
-                    highlighted_move = (move[2], move[3])
-                    time.sleep(0.5)
-                    highlighted_move = None
-                except queue.Empty:
-                    pass
-
-                for event in pygame.event.get():
+                asyncio.create_task(game_logic(board, mode, ai_player, ai_red, ai_blue, channel, stop_event, win_queue, initial_turn, metrics_queue))
+
+            view = BoardView(WIN)
+            while not stop_event.is_set() and not channel.closed:
+                snapshot = channel.latest()
+                if snapshot:
+                    # Only squares changed by the last move (or its highlight) are repainted
+                    last_move = snapshot.last_move_coords()
+                    view.render(snapshot, {last_move[2:]} if last_move else ())
+
+                for event in await wait_events(FPS):
                     if event.type == pygame.QUIT:
                         stop_event.set()
                         pygame.quit()
                         return
-
-                await asyncio.sleep(1.0 / FPS)
+                    if event.type == pygame.WINDOWEXPOSED:
+                        view.invalidate()
 
             try:
                 winner = win_queue.get_nowait()
                 metrics = metrics_queue.get_nowait()
+                red_score = 1.0 if winner == RED else 0.0 if winner == BLUE else 0.5
                 if winner == RED:
                     red_wins += 1
                     if initial_turn == RED:
@@ -594,6 +744,7 @@ async def main():
 
             except queue.Empty:
                 print(f"Game {game_num} ended with no winner")
+                red_score = 0.5
                 metrics = metrics_queue.get_nowait() if not metrics_queue.empty() else {
                     'winner': 'NONE',
                     'piece_diff': 0,
@@ -663,104 +814,62 @@ async def main():
             if platform.system() != "Emscripten":
                 game_thread.join(timeout=1)
 
+            if sprt:
+                sprt.record(red_score)
+                print(sprt.summary())
+                if sprt.status():
+                    print(f"SPRT decided after {game_num} games")
+                    break
+
         print(f"\nCompleted all games. Final results in '{metrics_csv}' and '{averages_csv}'.")
 
     else:
+        channel = GameChannel(notify=wake_gui)
         if platform.system() != "Emscripten":
-            game_thread = threading.Thread(target=game_logic, args=(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event, win_queue, turn, metrics_queue))
+            game_thread = threading.Thread(target=asyncio.run, args=(game_logic(board, mode, ai_player, ai_red, ai_blue, channel, stop_event, win_queue, turn, metrics_queue),))
             game_thread.daemon = True
             game_thread.start()
         else:
-            async def async_game_logic():
-                await game_logic(board, mode, ai_player, ai_red, ai_blue, move_queue, stop_event, win_queue, turn, metrics_queue)
-            asyncio.create_task(async_game_logic())
-
-        highlighted_move = None
-        while not stop_event.is_set():
-            clock.tick(FPS)
-            board.draw(WIN)
-            if selected_piece and mode != 'aivai':
-                board.highlight_moves(WIN, valid_moves)
-            if highlighted_move:
-                board.highlight_moves(WIN, {highlighted_move})
-            pygame.display.update()
-
-            try:
-                move = move_queue.get_nowait()
-                highlighted_move = (move[2], move[3])
-                time.sleep(0.5)
-                highlighted_move = None
-            except queue.Empty:
-                pass
-
-            if mode != 'aivai':
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        stop_event.set()
-                        pygame.quit()
-                        return
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        pos = pygame.mouse.get_pos()
-                        row, col = get_row_col_from_mouse(pos)
-                        piece = board.get_piece(row, col)
-                        if selected_piece:
-                            if (row, col) in valid_moves:
-                                result = board.move(selected_piece, row, col)
-                                logging.debug(f"Human move: {selected_piece.row},{selected_piece.col} to {row},{col}")
-                                move_queue.put((selected_piece.row, selected_piece.col, row, col))
-                                selected_piece = None
-                                valid_moves = set()
-                                turn = RED if turn == BLUE else BLUE
-                            else:
-                                logging.debug(f"Invalid human move attempted: {row},{col}")
-                                selected_piece = None
-                                valid_moves = set()
+            asyncio.create_task(game_logic(board, mode, ai_player, ai_red, ai_blue, channel, stop_event, win_queue, turn, metrics_queue))
+
+        view = BoardView(WIN)
+        selected = None  # Square of the human piece being moved
+        while not stop_event.is_set() and not channel.closed:
+            snapshot = channel.latest()
+            if snapshot:
+                highlights = set()
+                if selected:
+                    highlights = {move_coords(move)[2:] for move in snapshot.moves_from(*selected)}
+                last_move = snapshot.last_move_coords()
+                if last_move:
+                    highlights.add(last_move[2:])
+                # Only squares changed by the last move or the highlights are repainted
+                view.render(snapshot, highlights)
+
+            for event in await wait_events(FPS):
+                if event.type == pygame.QUIT:
+                    stop_event.set()
+                    channel.wake()  # The engine may be waiting for a human move
+                    pygame.quit()
+                    return
+                if event.type == pygame.WINDOWEXPOSED:
+                    view.invalidate()
+                if event.type == pygame.MOUSEBUTTONDOWN and snapshot and snapshot.turn != ai_player:
+                    row, col = get_row_col_from_mouse(event.pos)
+                    if selected:
+                        move = snapshot.find_move(*selected, row, col)
+                        if move is not None:
+                            # The engine applies it and publishes the next snapshot
+                            channel.send_move(snapshot.ply, move)
+                            logging.debug(f"Human move: {move_to_str(move)}")
                         else:
-                            if piece != 0 and piece.color == turn:
-                                selected_piece = piece
-                                valid_moves = board.get_valid_moves(piece)
-                                logging.debug(f"Selected piece at {piece.row},{piece.col} with valid moves: {valid_moves}")
-                            else:
-                                logging.debug(f"Clicked on invalid piece or empty square at {row},{col}")
-
-                if turn == BLUE and not selected_piece:
-                    has_moves = False
-                    for row in range(ROWS):
-                        for col in range(COLS):
-                            piece = board.get_piece(row, col)
-                            if piece != 0 and piece.color == BLUE:
-                                if board.can_move(piece):
-                                    has_moves = True
-                                    break
-                        if has_moves:
-                            break
-                    if not has_moves:
-                        logging.info("No valid moves for human (BLUE)")
-                        outcome_desc = (
-                            f"RED won: BLUE had no valid moves after {move_count} moves, "
-                            f"with RED capturing {captures_red} and BLUE capturing {captures_blue} pieces"
-                        )
-                        metrics_queue.put({
-                            'winner': RED,
-                            'piece_diff': 0,
-                            'king_diff': 0,
-                            'move_count': move_count,
-                            'captures_red': captures_red,
-                            'captures_blue': captures_blue,
-                            'promotions_red': promotions_red,
-                            'promotions_blue': promotions_blue,
-                            'outcome_desc': outcome_desc
-                        })
-                        win_queue.put(RED)
-                        stop_event.set()
-            else:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        stop_event.set()
-                        pygame.quit()
-                        return
-
-            await asyncio.sleep(1.0 / FPS)
+                            logging.debug(f"Invalid human move attempted: {row},{col}")
+                        selected = None
+                    elif snapshot.moves_from(row, col):
+                        selected = (row, col)
+                        logging.debug(f"Selected piece at {row},{col}")
+                    else:
+                        logging.debug(f"Clicked on invalid piece or empty square at {row},{col}")
 
         if platform.system() != "Emscripten":
             game_thread.join(timeout=1)
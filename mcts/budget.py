@@ -0,0 +1,49 @@
+"""Search budget bookkeeping shared by the searchers: early stopping and unused-budget reports."""
+import time
+from mcts.solver import LOSS
+
+
+def remaining_iterations(iterations, done, start, deadline, reused=0):
+    """Iterations left in the budget, estimated from the search rate so far when there is a deadline.
+
+    reused is the number of root visits the tree already had when the search
+    started (see mcts/ponder.py); they count towards the budget but not the rate.
+    """
+    remaining = iterations - done
+    if deadline and done > reused:
+        now = time.perf_counter()
+        rate = (done - reused) / max(now - start, 1e-9)
+        remaining = min(remaining, int((deadline - now) * rate) + 1)
+    return max(remaining, 0)
+
+
+def best_is_decided(root, remaining):
+    """True when no other root move can catch up with the most visited one in `remaining` iterations.
+
+    Moves proven lost are left out: their visits stop growing, and best_child() never picks them.
+    """
+    best = runner_up = 0
+    for child in root.children:
+        if child.proven == LOSS:
+            continue
+        if child.visits > best:
+            best, runner_up = child.visits, best
+        elif child.visits > runner_up:
+            runner_up = child.visits
+    return best > runner_up + remaining
+
+
+def search_stats(searcher, root, start, reason, reused=0):
+    """Summary of one search; reason is 'forced', 'solved', 'decided', 'budget' or 'cancelled' (mcts/stepper.py)."""
+    elapsed = time.perf_counter() - start
+    best_visits = max((child.visits for child in root.children), default=0)
+    return {
+        'reason': reason,
+        'iterations': root.visits,
+        'unused_iterations': remaining_iterations(searcher.iterations, root.visits, start,
+                                                  start + searcher.time_limit if searcher.time_limit else None, reused),
+        'reused_iterations': reused,
+        'elapsed': elapsed,
+        'unused_time': max(searcher.time_limit - elapsed, 0.0) if searcher.time_limit else 0.0,
+        'best_share': best_visits / root.visits if root.visits else 1.0,  # Low values mean an unsettled choice
+    }
@@ -0,0 +1,84 @@
+import sys
+import threading
+from collections import OrderedDict
+from checkers.moves import capture_count
+from config import EVALUATION_CACHE_BYTES, MOVE_CACHE_BYTES
+
+# Rough per-entry cost of the OrderedDict slot, key and small value
+ENTRY_OVERHEAD = 160
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by an approximate memory budget in bytes."""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=ENTRY_OVERHEAD):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (value, size)
+            self.bytes += size
+            self._evict()
+
+    def resize(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self.entries:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every searcher in the process
+EVALUATION_CACHE = LRUCache(EVALUATION_CACHE_BYTES)
+MOVE_CACHE = LRUCache(MOVE_CACHE_BYTES)
+
+
+def cached_moves(board, color):
+    """Return (moves, max_captures) for color, with moves as a fresh list of encoded ints."""
+    key = board.position_key(color)
+    entry = MOVE_CACHE.get(key)
+    if entry is None:
+        moves = tuple(board.legal_moves(color))
+        entry = (moves, max(map(capture_count, moves), default=0))
+        MOVE_CACHE.put(key, entry, ENTRY_OVERHEAD + sys.getsizeof(moves) + len(moves) * sys.getsizeof(1 << 40))
+    moves, max_captures = entry
+    return list(moves), max_captures
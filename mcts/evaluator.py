@@ -0,0 +1,65 @@
+"""Linear (logistic) position evaluator over the feature vectors of mcts/features.py.
+
+The value of a position for the side to move is sigmoid(features @ weights + bias),
+an estimated winning chance in [0, 1]. A batch of positions is one matrix
+multiply. Weights are fitted offline (experiments/fit_evaluator.py) and saved
+as an .npz file with 'weights' (FEATURES,) and 'bias' arrays.
+
+Searchers use it through their evaluator parameter, the path of a weights file:
+
+    {"class": "MCTSMaterialHeuristic", "evaluator": "weights.npz", "rollout_policy": "evaluate"}
+"""
+import threading
+import numpy as np
+from mcts.cache import EVALUATION_CACHE
+from mcts.features import FEATURES, board_features, extract_features
+
+_LOADED = {}  # path -> LinearEvaluator, so every searcher shares one copy
+_LOADED_LOCK = threading.Lock()
+
+
+class LinearEvaluator:
+    def __init__(self, weights, bias=0.0, name=None):
+        self.weights = np.asarray(weights, dtype=np.float32).reshape(FEATURES)
+        self.bias = float(bias)
+        self.name = name  # Part of the evaluation cache key
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if data['weights'].size != FEATURES:
+                raise ValueError(f"{path} holds {data['weights'].size} weights; the features have {FEATURES}")
+            return cls(data['weights'], data['bias'], name=path)
+
+    def save(self, path):
+        np.savez(path, weights=self.weights, bias=np.float32(self.bias))
+
+    def evaluate_features(self, features):
+        """Winning chances of the side to move for an (N, FEATURES) batch."""
+        logits = features @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def evaluate_batch(self, planes, mobilities):
+        return self.evaluate_features(extract_features(planes, mobilities))
+
+    def evaluate_boards(self, boards, turns):
+        """Winning chances of each side to move in turns."""
+        return self.evaluate_features(board_features(boards, turns))
+
+    def evaluate(self, board, turn, player):
+        """Winning chance of player with turn to move, through the shared evaluation cache."""
+        key = ('linear', self.name or id(self), board.position_key(turn))
+        value = EVALUATION_CACHE.get(key)
+        if value is None:
+            value = float(self.evaluate_boards([board], [turn])[0])
+            EVALUATION_CACHE.put(key, value)
+        return value if player == turn else 1.0 - value
+
+
+def load_evaluator(path):
+    """The LinearEvaluator saved at path, loaded once per process."""
+    with _LOADED_LOCK:
+        evaluator = _LOADED.get(path)
+        if evaluator is None:
+            evaluator = _LOADED[path] = LinearEvaluator.load(path)
+        return evaluator
@@ -0,0 +1,94 @@
+"""Feature planes and vectors for learned evaluators (experiments/selfplay.py writes them as training data).
+
+A position is encoded from the point of view of the side to move as four
+planes over the 50 dark squares: own men, own kings, opponent men, opponent
+kings. When RED is to move the board is turned 180 degrees (square s becomes
+49 - s), so the side to move always advances towards square 50 like BLUE.
+Moves in the same orientation are numbered from * 50 + to.
+
+The feature vector of a position (FEATURES float32 values) is the flattened
+planes, so a linear model over it holds a piece-square table per plane, then
+the piece count of each plane and the number of legal moves of each side.
+Batches are built from 20-byte binary positions (checkers/position.py) with
+array operations only; mobility needs move generation and is the one part
+computed per position.
+"""
+import numpy as np
+from checkers.constants import RED, BLUE
+from checkers.moves import SQUARES, square_index, move_from, move_to
+from checkers.position import POSITION_BYTES, to_bytes, position_board
+from mcts.cache import cached_moves
+
+PLANES = 4
+COUNTS = PLANES  # Pieces on each plane
+MOBILITY = 2  # Legal moves of the side to move and of the opponent
+FEATURES = PLANES * SQUARES + COUNTS + MOBILITY
+MOBILITY_SCALE = 0.1  # Keeps move counts on the scale of the 0/1 plane features
+
+
+def canonical_square(square, turn):
+    return SQUARES - 1 - square if turn == RED else square
+
+
+def encode_planes(board, turn, out=None):
+    """uint8 array of shape (PLANES, SQUARES); fills out if given."""
+    planes = out if out is not None else np.zeros((PLANES, SQUARES), dtype=np.uint8)
+    if out is not None:
+        planes.fill(0)
+    opponent = BLUE if turn == RED else RED
+    for color, plane in ((turn, 0), (opponent, 2)):
+        for row, col in board.pieces[color]:
+            king = board.get_piece(row, col).king
+            planes[plane + king, canonical_square(square_index(row, col), turn)] = 1
+    return planes
+
+
+def canonical_move(move, turn):
+    """Index of move in the from * 50 + to policy space of the side to move."""
+    return canonical_square(move_from(move), turn) * SQUARES + canonical_square(move_to(move), turn)
+
+
+def planes_from_bytes(positions):
+    """(N, PLANES, SQUARES) uint8 planes and (N,) bool RED-to-move of N binary positions.
+
+    positions is a sequence of 20-byte positions or an (N, 20) uint8 array.
+    """
+    if not isinstance(positions, np.ndarray):
+        positions = np.frombuffer(b''.join(positions), dtype=np.uint8)
+    bits = np.unpackbits(positions.reshape(-1, POSITION_BYTES), axis=1, bitorder='little')
+    red, blue, kings = bits[:, :SQUARES], bits[:, SQUARES:2 * SQUARES], bits[:, 2 * SQUARES:3 * SQUARES]
+    red_to_move = bits[:, 3 * SQUARES].astype(bool)
+    flip = red_to_move[:, None]
+    own = np.where(flip, red, blue)
+    opponent = np.where(flip, blue, red)
+    planes = np.stack((own & ~kings, own & kings, opponent & ~kings, opponent & kings), axis=1)
+    planes[red_to_move] = planes[red_to_move, :, ::-1]  # Turn the board for RED to move
+    return planes, red_to_move
+
+
+def planes_board(planes):
+    """(board, turn) equivalent to one position's planes: the side to move is BLUE, already oriented that way."""
+    pieces = [(square, BLUE if plane < 2 else RED, plane % 2 == 1) for plane, square in zip(*np.nonzero(planes))]
+    return position_board(pieces, BLUE), BLUE
+
+
+def mobility(board, turn):
+    """(legal moves of turn, legal moves of the opponent)."""
+    opponent = BLUE if turn == RED else RED
+    return len(cached_moves(board, turn)[0]), len(cached_moves(board, opponent)[0])
+
+
+def extract_features(planes, mobilities, out=None):
+    """(N, FEATURES) float32 feature vectors of N positions' planes and (own, opponent) move counts."""
+    planes = np.asarray(planes).reshape(-1, PLANES, SQUARES)
+    features = out if out is not None else np.empty((len(planes), FEATURES), dtype=np.float32)
+    features[:, :PLANES * SQUARES] = planes.reshape(len(planes), -1)
+    features[:, PLANES * SQUARES:PLANES * SQUARES + COUNTS] = planes.sum(axis=2)
+    features[:, PLANES * SQUARES + COUNTS:] = np.asarray(mobilities, dtype=np.float32).reshape(-1, MOBILITY) * MOBILITY_SCALE
+    return features
+
+
+def board_features(boards, turns):
+    """(N, FEATURES) feature vectors of boards, each from the view of its side to move in turns."""
+    planes, _ = planes_from_bytes([to_bytes(board, turn) for board, turn in zip(boards, turns)])
+    return extract_features(planes, [mobility(board, turn) for board, turn in zip(boards, turns)])
@@ -0,0 +1,101 @@
+import bisect
+import mmap
+import os
+import struct
+
+# File layout: header, then fixed-size records sorted by (key, move).
+# key = Board.position_key(turn); move is the encoded int of checkers/moves.py, so captures
+# with the same start and end squares but different captured pieces stay apart.
+MAGIC = b'CKBK'
+VERSION = 2
+HEADER = struct.Struct('<4sII')  # magic, version, record count
+RECORD = struct.Struct('<QQIf')  # key, move, games, score
+
+
+def write_book(path, stats):
+    """Write {(key, move): [games, score]} as a sorted book file."""
+    entries = sorted(stats.items())
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for (key, move), (games, score) in entries:
+            f.write(RECORD.pack(key, move, games, score))
+    os.replace(tmp_path, path)
+
+
+def read_book_stats(path):
+    """Load a book file back into the dictionary form used by write_book()."""
+    stats = {}
+    with OpeningBook(path) as book:
+        for i in range(book.count):
+            key, move, games, score = book._record(i)
+            stats[(key, move)] = [games, score]
+    return stats
+
+
+class _KeyView:
+    """Sequence of record keys, so bisect can search the mapped file directly."""
+    def __init__(self, book):
+        self.book = book
+
+    def __len__(self):
+        return self.book.count
+
+    def __getitem__(self, index):
+        return self.book._record(index)[0]
+
+
+class OpeningBook:
+    def __init__(self, path, min_games=2):
+        self.path = path
+        self.min_games = min_games  # Ignore moves seen in fewer games than this
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"Opening book '{path}' is truncated")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or size != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"'{path}' is not a valid opening book")
+        self._keys = _KeyView(self)
+
+    def _record(self, index):
+        return RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+
+    def probe(self, board, turn):
+        """Return [(move, games, score)] stored for this position."""
+        key = board.position_key(turn)
+        index = bisect.bisect_left(self._keys, key)
+        entries = []
+        while index < self.count:
+            record_key, move, games, score = self._record(index)
+            if record_key != key:
+                break
+            entries.append((move, games, score))
+            index += 1
+        return entries
+
+    def choose_move(self, board, turn):
+        """Return the most played legal book move as an encoded int, or None."""
+        entries = self.probe(board, turn)
+        if not entries:
+            return None
+        # Matching against the legal moves also guards against hash collisions
+        legal = set(board.legal_moves(turn))
+        candidates = [(games, score / games, move) for move, games, score in entries
+                      if games >= self.min_games and move in legal]
+        if not candidates:
+            return None
+        return max(candidates)[2]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,49 @@
+"""Pondering: searching on the opponent's time.
+
+While the human thinks, a Ponderer grows a tree for the position with the
+opponent to move, scored from the AI's point of view like any other search.
+When the opponent's move arrives, advance() detaches the subtree for that
+move. The AI's next search continues from it (searcher.reuse_root) instead
+of starting from an empty tree.
+"""
+import time
+from mcts.solver import propagate_proof
+
+
+class Ponderer:
+    def __init__(self, searcher, board, to_move, max_iterations=5000):
+        self.searcher = searcher  # Searcher for the AI; its own root_board is not used
+        self.root = searcher._make_root(board, to_move)
+        self.max_iterations = max_iterations  # Bounds the memory held by the tree
+
+    def step(self, seconds):
+        """Search for about `seconds`; returns False once there is nothing left to do."""
+        root = self.root
+        deadline = time.perf_counter() + seconds
+        while root.visits < self.max_iterations and root.proven is None:
+            if not root.untried_moves and not root.children:
+                return False  # The game is over in this position
+            leaf = self.searcher._select(root)
+            propagate_proof(leaf)
+            self.searcher._backpropagate(leaf, self.searcher._simulate(leaf))
+            if time.perf_counter() >= deadline:
+                return True
+        return False
+
+    def advance(self, move):
+        """Subtree after the opponent plays move, detached from the rest of the tree, or None."""
+        for child in self.root.children:
+            if child.move == move:
+                child.parent = None
+                return child
+        return None
+
+
+def take_reusable_root(searcher):
+    """searcher.reuse_root if it is a tree for searcher.root_board, otherwise None; clears it either way."""
+    root, searcher.reuse_root = searcher.reuse_root, None
+    if root is None or root.player != searcher.player:
+        return None
+    if root.board.position_key(root.player) != searcher.root_board.position_key(searcher.player):
+        return None
+    return root
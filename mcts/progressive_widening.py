@@ -2,32 +2,34 @@ import random
 import copy
 import math
 from checkers.board import Board
-from checkers.constants import RED, BLUE, ROWS, COLS
+from checkers.constants import RED, BLUE
+from mcts.solver import prove_terminal, unproven_children
+from mcts.stepper import SearchStepper
+from mcts.cache import cached_moves
 
 class Node:
     def __init__(self, board, move=None, parent=None, player=None):
         self.board = board
-        self.move = move  # Tuple (piece, dest_row, dest_col)
+        self.move = move  # Encoded int move (see checkers/moves.py)
         self.parent = parent
         self.children = []
         self.visits = 0
         self.wins = 0
         self.untried_moves = []
+        self.proven = None  # solver.WIN / solver.LOSS once the result is exact (see mcts/solver.py)
         self.player = player
 
     def add_child(self, child_node):
         self.children.append(child_node)
-        if child_node.move in self.untried_moves:
-            self.untried_moves.remove(child_node.move)
 
     def update(self, result):
         self.visits += 1
         self.wins += result
 
-    def ucb1(self, parent_visits):
+    def ucb1(self, parent_visits, exploration=math.sqrt(2)):
         if self.visits == 0:
             return float('inf')
-        return (self.wins / self.visits) + math.sqrt(2 * math.log(parent_visits) / self.visits)
+        return (self.wins / self.visits) + exploration * math.sqrt(math.log(parent_visits) / self.visits)
 
 class MCTSPROGRESSIVE:
     def __init__(self, board, player, iterations=300):
@@ -35,51 +37,44 @@ class MCTSPROGRESSIVE:
         self.player = player
         self.opponent = BLUE if player == RED else RED
         self.iterations = iterations
+        self.time_limit = None  # Optional per-move budget in seconds; search stops at whichever limit comes first
+        self.exploration = math.sqrt(2)  # UCB1 exploration constant
+        self.max_simulation_steps = 30  # Rollout length before falling back to the evaluation
+        self.rollout_policy = 'fixed'  # Only 'fixed': without an evaluator, 'margin' and 'evaluate' have nothing to go on
+        self.root_policy = 'ucb'  # 'ucb' or 'sequential_halving' (spreads small budgets evenly over root moves)
+        self.early_stop = True  # Stop once the most visited root move cannot be overtaken
+        self.last_search_stats = None  # Filled by search(); reports the unused budget
+        self.reuse_root = None  # Tree kept from pondering (mcts/ponder.py); search() continues from it
         self.k = 1.0  # Progressive Widening constant
         self.alpha = 0.5  # Progressive Widening exponent
 
     def search(self):
-        root = Node(copy.deepcopy(self.root_board), player=self.player)
+        # The search loop itself lives in mcts/stepper.py, shared with cooperative and server searches
+        return SearchStepper(self).run()
+
+    def _make_root(self, board, player):
+        """Fresh search tree for player to move on a copy of board."""
+        if self.rollout_policy != 'fixed':
+            raise ValueError(f"MCTSPROGRESSIVE has no evaluator; rollout_policy must be 'fixed', not {self.rollout_policy!r}")
+        root = Node(copy.deepcopy(board), player=player)
         self._initialize_untried_moves(root)
-
-        if not root.untried_moves:
-            return None  # No valid moves available
-
-        for _ in range(self.iterations):
-            node = self._select(root)
-            result = self._simulate(node)
-            self._backpropagate(node, result)
-
-        best_child = max(root.children, key=lambda c: c.visits) if root.children else None
-        return best_child.move if best_child else None
+        return root
 
     def _initialize_untried_moves(self, node):
         """Initialize all possible moves for the current player, prioritizing captures."""
-        moves = []
-        capture_moves = []
-        has_captures = False
-        max_captures = node.board.get_max_captures(node.player)
-
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = node.board.get_piece(row, col)
-                if piece != 0 and piece.color == node.player:
-                    valid_moves = node.board.get_valid_moves(piece)
-                    for dest_row, dest_col in valid_moves:
-                        temp_board = copy.deepcopy(node.board)
-                        temp_piece = temp_board.get_piece(piece.row, piece.col)
-                        valid, captured, _ = temp_board.valid_move(temp_piece, dest_row, dest_col)
-                        if valid and captured and len(captured) == max_captures:
-                            capture_moves.append((piece, dest_row, dest_col))
-                            has_captures = True
-                        elif valid and not has_captures:
-                            moves.append((piece, dest_row, dest_col))
-
-        node.untried_moves = capture_moves if has_captures else moves
+        if node.board.is_draw():
+            node.untried_moves = []  # Drawn by rule: the node is a leaf
+            return
+        # Only maximum captures are legal when any capture exists (Polish Checkers rule)
+        node.untried_moves, _ = cached_moves(node.board, node.player)
 
     def _select(self, node):
+        # Proven children are skipped; if only proven children remain, widen instead
         while node.children and not self._should_expand(node):
-            node = max(node.children, key=lambda c: c.ucb1(node.visits))
+            children = unproven_children(node)
+            if not children:
+                break
+            node = max(children, key=lambda c: c.ucb1(node.visits, self.exploration))
         return self._expand(node)
 
     def _should_expand(self, node):
@@ -92,74 +87,54 @@ class MCTSPROGRESSIVE:
         return children_count < max_children
 
     def _expand(self, node):
-        if not self._should_expand(node) and node.children:
-            return max(node.children, key=lambda c: c.ucb1(node.visits))
+        # The widening limit is enforced by _select
         if not node.untried_moves:
             return node
-        move = random.choice(node.untried_moves)
-        piece, dest_row, dest_col = move
-        new_board = copy.deepcopy(node.board)
-        new_piece = new_board.get_piece(piece.row, piece.col)
-        
-        if new_piece == 0 or new_piece.color != node.player:
-            node.untried_moves.remove(move)
-            return node
+        # Swap-remove a random untried move in O(1)
+        index = random.randrange(len(node.untried_moves))
+        move = node.untried_moves[index]
+        node.untried_moves[index] = node.untried_moves[-1]
+        node.untried_moves.pop()
 
-        new_board.move(new_piece, dest_row, dest_col)
-        new_node = Node(new_board, move, node, player=self.opponent)
+        new_board = copy.deepcopy(node.board)
+        new_board.make_move(move)
+        new_node = Node(new_board, move, node, player=BLUE if node.player == RED else RED)
         self._initialize_untried_moves(new_node)
+        prove_terminal(new_node)
         node.add_child(new_node)
         return new_node
 
     def _simulate(self, node):
         current_board = copy.deepcopy(node.board)
         current_player = node.player
-        max_simulation_steps = 30
-        seen_states = set()
 
-        for step in range(max_simulation_steps):
+        max_steps = self.max_simulation_steps
+        for step in range(max_steps + 1):
             winner = current_board.get_winner()
             if winner is not None:
                 return 1.0 if winner == self.player else 0.0
 
-            board_state = tuple(
-                tuple(current_board.get_piece(row, col).color if current_board.get_piece(row, col) != 0 else 0
-                      for col in range(COLS))
-                for row in range(ROWS)
-            )
-            if board_state in seen_states:
-                return 0.5  # Draw due to repetition
-            seen_states.add(board_state)
-
-            capture_moves = []
-            normal_moves = []
-            max_captures = current_board.get_max_captures(current_player)
-
-            for row in range(ROWS):
-                for col in range(COLS):
-                    piece = current_board.get_piece(row, col)
-                    if piece != 0 and piece.color == current_player:
-                        valid_moves = current_board.get_valid_moves(piece)
-                        for dest_row, dest_col in valid_moves:
-                            temp_board = copy.deepcopy(current_board)
-                            temp_piece = temp_board.get_piece(piece.row, piece.col)
-                            valid, captured, _ = temp_board.valid_move(temp_piece, dest_row, dest_col)
-                            if valid and captured and len(captured) == max_captures:
-                                capture_moves.append((piece, dest_row, dest_col))
-                            elif valid and not max_captures:
-                                normal_moves.append((piece, dest_row, dest_col))
-
-            moves = capture_moves if capture_moves else normal_moves
+            if current_board.is_draw():
+                return 0.5  # Repetition, 25 king moves or a reduced-material ending
+
+            if step == max_steps:
+                break
+
+            # Only maximum captures are legal when any capture exists
+            moves = current_board.legal_moves(current_player)
             if not moves:
                 return 0.0 if current_player == self.player else 1.0
 
-            piece, dest_row, dest_col = random.choice(moves)
-            current_board.move(piece, dest_row, dest_col)
+            current_board.make_move(random.choice(moves))
             current_player = BLUE if current_player == RED else RED
 
-        return 0.5  # Non-terminal state after max steps treated as draw
+        return self._evaluate_board(current_board)
+
+    def _evaluate_board(self, board):
+        return 0.5  # No evaluator: a non-terminal state after the rollout is treated as a draw
 
     def _backpropagate(self, node, result):
         while node is not None:
-            node.update(result if node.player == self.player else 1.0 - result)
+            # Stats are kept for the player who moved into the node, so parents pick their best child
+            node.update(result if node.player != self.player else 1.0 - result)
             node = node.parent
\ No newline at end of file
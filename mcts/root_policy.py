@@ -0,0 +1,71 @@
+"""Sequential halving at the root for small iteration budgets.
+
+UCB1 spends a tiny budget unevenly: with 15 iterations and 9 root moves most
+moves are visited once. Sequential halving splits the budget into
+ceil(log2 K) rounds. Every surviving root move is searched equally in a
+round, and the worse half is dropped after each round. Below the root the
+searcher's own UCB selection is used unchanged.
+"""
+import math
+import time
+from mcts.solver import propagate_proof, unproven_children, best_child
+from mcts.budget import remaining_iterations
+
+
+def _mean(child):
+    return child.wins / child.visits if child.visits else 0.0
+
+
+def _iterate(searcher, node):
+    """One select/simulate/backpropagate pass starting at node."""
+    leaf = searcher._select(node)
+    propagate_proof(leaf)
+    searcher._backpropagate(leaf, searcher._simulate(leaf))
+
+
+def sequential_halving_steps(searcher, root, start, deadline):
+    """Search root by sequential halving, yielding after every iteration (driven by mcts/stepper.py).
+
+    Returns (chosen child, stop reason for search_stats).
+    """
+    def out_of_budget():
+        return root.visits >= budget or (deadline and time.perf_counter() >= deadline)
+
+    budget = searcher.iterations
+    reused = root.visits  # Visits already in a tree kept from pondering (mcts/ponder.py)
+    if out_of_budget():
+        return best_child(root), 'budget'
+    # The first round starts with one visit to every root move
+    while root.untried_moves:
+        if root.proven is not None:
+            return best_child(root), 'solved'
+        if out_of_budget():
+            return max(root.children, key=_mean, default=None), 'budget'
+        leaf = searcher._expand(root)
+        propagate_proof(leaf)
+        searcher._backpropagate(leaf, searcher._simulate(leaf))
+        yield
+    # With a deadline the budget is estimated from the rate of the first visits
+    budget = root.visits + remaining_iterations(searcher.iterations, root.visits, start, deadline, reused)
+
+    candidates = unproven_children(root)
+    target = 0
+    while len(candidates) > 1:
+        # Split what is left evenly over the remaining rounds, so rounding never strands budget
+        rounds = math.ceil(math.log2(len(candidates)))
+        target += max((budget - root.visits) // (len(candidates) * rounds), 1)
+        # Best moves first, so running out of budget mid-round only shortchanges the weakest
+        candidates.sort(key=_mean, reverse=True)
+        for child in candidates:
+            while child.visits < target and child.proven is None:
+                if root.proven is not None:
+                    return best_child(root), 'solved'
+                if out_of_budget():
+                    return max(candidates, key=_mean), 'budget'
+                _iterate(searcher, child)
+                yield
+        if root.proven is not None:
+            return best_child(root), 'solved'
+        candidates = sorted((c for c in candidates if c.proven is None), key=_mean, reverse=True)
+        candidates = candidates[:math.ceil(len(candidates) / 2)]
+    return (candidates[0] if candidates else best_child(root)), 'budget'
@@ -0,0 +1,44 @@
+"""MCTS-Solver support shared by the searchers.
+
+node.proven holds the exact game result, when known, from the point of view of
+the player who made node.move (the same point of view as node.wins):
+WIN, LOSS or None while unproven.
+"""
+WIN = 1
+LOSS = -1
+
+
+def prove_terminal(node):
+    """Mark node as proven if the game is over in its position."""
+    winner = node.board.get_winner()
+    if winner is not None:
+        node.proven = LOSS if winner == node.player else WIN
+
+
+def propagate_proof(node):
+    """Push a proven result from node towards the root as far as it decides the parents."""
+    while node.parent is not None and node.proven is not None:
+        parent = node.parent
+        if node.proven == WIN:
+            # The player to move at parent has a winning move
+            parent.proven = LOSS
+        elif not parent.untried_moves and all(child.proven == LOSS for child in parent.children):
+            # Every move from parent loses for the player to move there
+            parent.proven = WIN
+        else:
+            return
+        node = parent
+
+
+def unproven_children(node):
+    return [child for child in node.children if child.proven is None]
+
+
+def best_child(root):
+    """A proven winning child if there is one, otherwise the most visited child not proven lost."""
+    if not root.children:
+        return None
+    for child in root.children:
+        if child.proven == WIN:
+            return child
+    return max(root.children, key=lambda c: (c.proven != LOSS, c.visits))
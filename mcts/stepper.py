@@ -0,0 +1,121 @@
+"""The search loop of every searcher, runnable a slice at a time.
+
+searcher.search() is SearchStepper(searcher).run(). A SearchStepper holds the
+tree between calls to step(), so a single-threaded event loop (the Emscripten
+build, or one process serving many games) can interleave searches and stay
+responsive:
+
+    stepper = SearchStepper(searcher)
+    while not stepper.step(16):
+        await asyncio.sleep(0)
+    move = stepper.best_move()
+
+search_async() wraps that loop. A search can be cancelled at any time; the
+best move found so far is still available.
+"""
+import asyncio
+import time
+from mcts.solver import propagate_proof, best_child
+from mcts.budget import remaining_iterations, best_is_decided, search_stats
+from mcts.root_policy import sequential_halving_steps
+from mcts.ponder import take_reusable_root
+
+
+class SearchStepper:
+    def __init__(self, searcher):
+        self.searcher = searcher
+        self.root = take_reusable_root(searcher) or searcher._make_root(searcher.root_board, searcher.player)
+        self.start = time.perf_counter()
+        self.reused = self.root.visits
+        self.move = None  # Chosen move once done
+        self.done = False
+        self.cancelled = False
+        moves = self.root.untried_moves + [child.move for child in self.root.children]
+        if len(moves) <= 1:
+            # No move, or a forced one: nothing to search
+            self._finish(moves[0] if moves else None, 'forced' if moves else 'budget')
+            return
+        deadline = self.start + searcher.time_limit if searcher.time_limit else None
+        if searcher.root_policy == 'sequential_halving':
+            self.steps = sequential_halving_steps(searcher, self.root, self.start, deadline)
+        else:
+            self.steps = self._ucb_steps(deadline)
+
+    def step(self, iterations):
+        """Run up to `iterations` search iterations; returns True once the search is over."""
+        for _ in range(iterations):
+            if self.done:
+                break
+            self._iterate()
+        return self.done
+
+    def run(self):
+        """Search to the end; returns the chosen move."""
+        while not self.done:
+            self._iterate()
+        return self.move
+
+    def cancel(self):
+        """Stop searching; best_move() keeps the choice so far."""
+        if not self.done:
+            self.cancelled = True
+            self.steps.close()
+            chosen = best_child(self.root)
+            self._finish(chosen.move if chosen else None, 'cancelled')
+
+    def best_move(self):
+        """The chosen move once done, otherwise the best move so far (None before any iteration)."""
+        if self.done:
+            return self.move
+        chosen = best_child(self.root)
+        return chosen.move if chosen else None
+
+    def _iterate(self):
+        try:
+            next(self.steps)
+        except StopIteration as stop:
+            chosen, reason = stop.value
+            self._finish(chosen.move if chosen else None, reason)
+
+    def _finish(self, move, reason):
+        self.move = move
+        self.done = True
+        self.searcher.last_search_stats = search_stats(self.searcher, self.root, self.start, reason, self.reused)
+
+    def _ucb_steps(self, deadline):
+        searcher, root = self.searcher, self.root
+        reason = 'budget'
+        while root.visits < searcher.iterations:  # Visits reused from pondering count towards the budget
+            if deadline and time.perf_counter() >= deadline:
+                break
+            if root.proven is not None:
+                reason = 'solved'  # More iterations cannot change the choice
+                break
+            if searcher.early_stop and best_is_decided(
+                    root, remaining_iterations(searcher.iterations, root.visits, self.start, deadline, self.reused)):
+                reason = 'decided'
+                break
+            node = searcher._select(root)
+            propagate_proof(node)
+            searcher._backpropagate(node, searcher._simulate(node))
+            yield
+        return best_child(root), reason
+
+
+async def search_async(searcher, slice_iterations=16, cancel_event=None):
+    """searcher.search() that yields to the event loop every slice_iterations iterations.
+
+    Setting cancel_event (anything with is_set()) or cancelling the task stops
+    the search; with cancel_event the best move so far is returned.
+    """
+    stepper = SearchStepper(searcher)
+    try:
+        while not stepper.step(slice_iterations):
+            if cancel_event is not None and cancel_event.is_set():
+                stepper.cancel()
+                break
+            await asyncio.sleep(0)
+    except asyncio.CancelledError:
+        stepper.cancel()
+        raise
+    return stepper.best_move()
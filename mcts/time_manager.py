@@ -0,0 +1,58 @@
+"""Per-move search budgets from a game clock.
+
+A TimeManager owns one side's clock. Before each search, allocate() turns the
+remaining time into a budget for that move. After the move, record() charges
+the time actually spent and adds the increment.
+"""
+import math
+from checkers.constants import RED, BLUE
+
+
+class TimeManager:
+    def __init__(self, total_time, increment=0.0):
+        self.remaining = total_time
+        self.increment = increment
+        self.safety_margin = 0.05  # Seconds never handed out, for move generation and GUI overhead
+        self.min_time = 0.01  # Smallest budget worth starting a search for
+        self.max_fraction = 0.25  # Never spend more than this share of the clock on one move
+        self.bank = 0.0  # Time saved by early-terminated searches, spent on the next hard positions
+        self.bank_spend = 0.5  # Share of the bank offered to each move
+        self.instability = 0.0  # 1 - best move's visit share in this side's last search
+
+    def moves_to_go(self, board):
+        """Expected number of our remaining moves, from how much material is left."""
+        pieces = board.piece_count(RED) + board.piece_count(BLUE)
+        return 10 + 30 * pieces / 40
+
+    def allocate(self, board, num_moves):
+        """Search budget in seconds for the side to move with num_moves legal moves."""
+        available = self.remaining - self.safety_margin
+        if available <= self.min_time:
+            return self.min_time
+        if num_moves <= 1:
+            return self.min_time  # Forced moves are returned without searching
+
+        budget = available / self.moves_to_go(board) + 0.8 * self.increment
+        # Wider positions and unsettled searches deserve more time
+        budget *= min(max(math.sqrt(num_moves / 8), 0.5), 1.5)
+        budget *= 1.0 + self.instability
+
+        bonus = self.bank * self.bank_spend
+        self.bank -= bonus
+        budget += bonus
+        return max(min(budget, available * self.max_fraction), self.min_time)
+
+    def record(self, elapsed, budget, stats=None):
+        """Charge a finished move to the clock; stats is the searcher's last_search_stats."""
+        self.remaining += self.increment - elapsed
+        if stats is None:
+            # Book move or no search: everything not spent goes to the bank
+            self.bank += max(budget - elapsed, 0.0)
+            return
+        self.bank += stats['unused_time']
+        if stats['iterations']:
+            self.instability = 1.0 - stats['best_share']
+
+    @property
+    def flagged(self):
+        return self.remaining <= 0.0
@@ -0,0 +1,7 @@
+"""Headless asyncio game server: many concurrent games over a JSON-lines socket protocol.
+
+    python -m server --port 8765 --workers 4
+    python -m server.client --port 8765 --games 8
+
+See server/protocol.py for the messages and server/app.py for the service.
+"""
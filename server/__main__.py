@@ -0,0 +1,27 @@
+import argparse
+import asyncio
+import logging
+from server.app import GameServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless checkers game server (JSON lines, see server/protocol.py)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('--workers', type=int, default=None, help='search processes (default: one per CPU)')
+    parser.add_argument('--max-pending', type=int, default=64,
+                        help='AI moves queued or running at once; more are refused as busy')
+    parser.add_argument('--max-time', type=float, default=10.0, help='cap on the time budget of an AI move')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = GameServer(args.workers, args.max_pending, args.max_time)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
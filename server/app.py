@@ -0,0 +1,221 @@
+"""The game server: games live in the asyncio process, searches run in a process pool.
+
+Load is bounded at three levels:
+- Searches: at most max_pending AI moves are queued or running at once.
+  Requests beyond that are refused with a retryable "busy" error instead of
+  queueing without limit.
+- Connections: each one has at most MAX_INFLIGHT requests in progress. The
+  server stops reading from a client that has more, so TCP flow control
+  pushes back on it.
+- Games: a game serves one AI move at a time.
+
+A game belongs to the connection that created it; other connections cannot
+see, play or close it.
+
+When a client disconnects, its requests are cancelled. Queued searches are
+dropped and running ones are stopped through their cancel flag. Its games are
+closed.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from checkers.board import Board
+from checkers.constants import RED, BLUE
+from checkers.moves import move_to_str, move_captures, move_promotes
+from checkers.position import to_bytes, from_fen
+from experiments.match import SEARCHERS
+from server import protocol
+from server.protocol import ProtocolError
+from server.worker import init_worker, search_move
+
+MAX_INFLIGHT = 16  # Requests in progress per connection
+DEFAULT_TIME_LIMIT = 1.0  # Seconds per AI move when the request gives none
+
+
+class Game:
+    def __init__(self, game_id, board, turn):
+        self.id = game_id
+        self.board = board
+        self.turn = turn
+        self.ply = 0
+        # What workers get: the position after the last capture or promotion and the moves since.
+        # A rebuilt board starts any reduced-material ending afresh, so the base only moves when
+        # the ending changes; replaying the tail then restores the draw-rule state exactly.
+        self.base = to_bytes(board, turn)
+        self.tail = []
+        self.searching = False
+
+    def play(self, move):
+        limit = self.board.reduced_material_limit
+        self.board.make_move(move)
+        self.turn = BLUE if self.turn == RED else RED
+        self.ply += 1
+        if ((move_captures(move) or move_promotes(move))
+                and (self.board.reduced_material_limit is None or self.board.reduced_material_limit != limit)):
+            self.base = to_bytes(self.board, self.turn)
+            self.tail = []
+        else:
+            self.tail.append(move)
+
+    def legal_moves(self):
+        if self.board.get_winner() is not None or self.board.is_draw():
+            return []
+        return self.board.legal_moves(self.turn)
+
+    def state(self):
+        return protocol.state_message(self.id, self.board, self.turn, self.ply)
+
+
+class GameServer:
+    def __init__(self, workers=None, max_pending=64, max_time=10.0):
+        self.max_pending = max_pending
+        self.max_time = max_time  # Cap on a request's time budget
+        self.cancel_flags = multiprocessing.Array('b', max_pending)  # One per job slot, see server/worker.py
+        self.free_slots = list(range(max_pending))
+        self.pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self.cancel_flags,))
+        self.games = {}
+        self.game_ids = itertools.count(1)
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None):
+        """Listen on a Unix socket if path is given, otherwise on TCP host:port, until cancelled."""
+        if path:
+            server = await asyncio.start_unix_server(self.handle_client, path, limit=protocol.MAX_LINE_BYTES)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port, limit=protocol.MAX_LINE_BYTES)
+        logging.info(f"Serving on {path or f'{host}:{port}'}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle_client(self, reader, writer):
+        owned = set()  # Games created by this connection, closed when it goes away
+        tasks = set()
+        inflight = asyncio.Semaphore(MAX_INFLIGHT)
+        write_lock = asyncio.Lock()
+
+        async def respond(request):
+            try:
+                response = await self.dispatch(request, owned)
+            except ProtocolError as e:
+                response = protocol.error(request.get('id'), e)
+            except Exception as e:
+                logging.exception(f"Request {request!r} failed")
+                response = protocol.error(request.get('id'), f'internal error: {e}')
+            async with write_lock:
+                writer.write(protocol.encode(response))
+                await writer.drain()
+
+        try:
+            while True:
+                await inflight.acquire()
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = protocol.decode(line)
+                except ProtocolError as e:
+                    async with write_lock:
+                        writer.write(protocol.encode(protocol.error(None, e)))
+                        await writer.drain()
+                    inflight.release()
+                    continue
+                task = asyncio.create_task(respond(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: inflight.release())
+        except (ConnectionError, ValueError) as e:
+            # ValueError: a line longer than MAX_LINE_BYTES
+            logging.info(f"Dropping client: {e}")
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for game_id in owned:
+                self.games.pop(game_id, None)
+            writer.close()
+
+    async def dispatch(self, request, owned):
+        op = request['op']
+        request_id = request.get('id')
+        if op == 'new_game':
+            if 'fen' in request:
+                try:
+                    board, first_turn = from_fen(str(request['fen']))
+                except ValueError as e:
+                    raise ProtocolError(str(e))
+            else:
+                board, first_turn = Board(), protocol.COLORS.get(request.get('first_turn', 'blue'))
+                if first_turn is None:
+                    raise ProtocolError('first_turn must be "red" or "blue"')
+            game = Game(next(self.game_ids), board, first_turn)
+            self.games[game.id] = game
+            owned.add(game.id)
+            return {'id': request_id, 'ok': True, 'game': game.id, 'state': game.state()}
+
+        game = self.games.get(request.get('game'))
+        if game is None or game.id not in owned:
+            # Games of other connections are reported as missing, so ids cannot be probed
+            raise ProtocolError(f"no game {request.get('game')!r}")
+        if op == 'state':
+            return {'id': request_id, 'ok': True, 'state': game.state()}
+        if op == 'close':
+            if game.searching:
+                raise ProtocolError('the game is searching')
+            self.games.pop(game.id)
+            owned.discard(game.id)
+            return {'id': request_id, 'ok': True}
+        if op == 'move':
+            if game.searching:
+                raise ProtocolError('the game is searching')
+            move = protocol.parse_move(request.get('move'), game.legal_moves())
+            game.play(move)
+            return {'id': request_id, 'ok': True, 'move': move, 'notation': move_to_str(move), 'state': game.state()}
+        if op == 'ai_move':
+            return await self.ai_move(request, game)
+        raise ProtocolError(f'unknown op {op!r}')
+
+    async def ai_move(self, request, game):
+        config = request.get('searcher', {'class': 'MCTS'})
+        if not isinstance(config, dict) or config.get('class') not in SEARCHERS:
+            raise ProtocolError(f'searcher must be a configuration with "class" one of {sorted(SEARCHERS)}')
+        try:
+            time_limit = min(float(request.get('time_limit', DEFAULT_TIME_LIMIT)), self.max_time)
+        except (TypeError, ValueError):
+            raise ProtocolError('time_limit must be a number of seconds')
+        if game.searching:
+            raise ProtocolError('the game is already searching')
+        if not game.legal_moves():
+            raise ProtocolError('the game is over')
+        if not self.free_slots:
+            raise ProtocolError('busy', retry=True)
+
+        slot = self.free_slots.pop()
+        self.cancel_flags[slot] = 0
+        game.searching = True
+        job = self.pool.submit(search_move, slot, game.base, list(game.tail), config, time.time() + time_limit)
+        future = asyncio.wrap_future(job)
+        try:
+            move, stats = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The client went away: drop the job if it is still queued, otherwise stop it.
+            # The slot is only reused once the worker is done with its flag.
+            if not job.cancel():
+                self.cancel_flags[slot] = 1
+                await asyncio.gather(future, return_exceptions=True)
+            raise
+        except ValueError as e:
+            raise ProtocolError(str(e))  # Bad searcher parameters
+        finally:
+            game.searching = False
+            self.free_slots.append(slot)
+
+        if move is None:
+            raise ProtocolError('no move found within the time budget', retry=True)
+        game.play(move)
+        return {'id': request.get('id'), 'ok': True, 'move': move, 'notation': move_to_str(move),
+                'stats': stats, 'state': game.state()}
@@ -0,0 +1,118 @@
+"""Client for the game server, and an end-to-end check of it.
+
+    python -m server.client --port 8765 --games 8 --time-limit 0.2
+
+plays that many AI-vs-AI games at once through one connection, with
+pipelined requests, and prints each result and the server's search stats.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from server.protocol import MAX_LINE_BYTES
+
+
+class ServerError(Exception):
+    def __init__(self, message, retry=False):
+        super().__init__(message)
+        self.retry = retry
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending = {}  # Request id -> future of its response
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, path=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE_BYTES)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        """Send a request and wait for its response; raises ServerError if it failed."""
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write((json.dumps({'id': request_id, 'op': op, **fields}) + '\n').encode())
+        await self.writer.drain()
+        response = await future
+        if not response['ok']:
+            raise ServerError(response['error'], response.get('retry', False))
+        return response
+
+    async def close(self):
+        self.receiver.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def _receive(self):
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                future = self.pending.pop(response.get('id'), None)
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection to the server closed'))
+
+
+async def play_ai_game(client, red, blue, time_limit, max_plies=200):
+    """Play one game with the server choosing every move; returns (result, plies, stats of each move)."""
+    response = await client.request('new_game')
+    game = response['game']
+    state = response['state']
+    all_stats = []
+    while state['result'] is None and state['ply'] < max_plies:
+        searcher = red if state['turn'] == 'red' else blue
+        try:
+            response = await client.request('ai_move', game=game, searcher=searcher, time_limit=time_limit)
+        except ServerError as e:
+            if not e.retry:
+                raise
+            await asyncio.sleep(0.05)  # The server is at capacity
+            continue
+        state = response['state']
+        all_stats.append(response['stats'])
+    await client.request('close', game=game)
+    return state['result'] or 'unfinished', state['ply'], all_stats
+
+
+async def run(args):
+    client = await Client.connect(args.host, args.port, args.unix)
+    start = time.perf_counter()
+    red = {'class': args.red}
+    blue = {'class': args.blue}
+    results = await asyncio.gather(*(play_ai_game(client, red, blue, args.time_limit) for _ in range(args.games)))
+    elapsed = time.perf_counter() - start
+    searches = 0
+    for number, (result, plies, stats) in enumerate(results, 1):
+        searches += len(stats)
+        iterations = sum(s['iterations'] for s in stats)
+        print(f"Game {number}: {result} after {plies} plies, {iterations} iterations")
+    print(f"{args.games} games, {searches} AI moves in {elapsed:.1f}s ({searches / elapsed:.1f} moves/s)")
+    await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='connect to this Unix socket path instead of TCP')
+    parser.add_argument('--games', type=int, default=4)
+    parser.add_argument('--time-limit', type=float, default=0.2)
+    parser.add_argument('--red', default='MCTSMaterialHeuristic')
+    parser.add_argument('--blue', default='MCTS')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""JSON-lines protocol of the game server.
+
+Every message is one JSON object on one line. Requests carry an "op" and an
+optional "id", which is echoed in the response so a client can pipeline
+requests. Responses have "ok": true plus the op's fields, or "ok": false and
+an "error" (with "retry": true when the server is only busy).
+
+    {"id": 1, "op": "new_game"}                          -> {"game": 7, "state": ...}
+    {"id": 2, "op": "state", "game": 7}                  -> {"state": ...}
+    {"id": 3, "op": "move", "game": 7, "move": "32-28"}  -> {"move": ..., "state": ...}
+    {"id": 4, "op": "ai_move", "game": 7, "searcher": {"class": "MCTS"}, "time_limit": 0.5}
+                                                         -> {"move": ..., "stats": ..., "state": ...}
+    {"id": 5, "op": "close", "game": 7}                  -> {}
+
+new_game starts from the initial position with an optional "first_turn" ("red"
+or "blue", default blue), or from a "fen" (see checkers/position.py). A move
+is the encoded int from checkers/moves.py or its notation ("32-28", "19x30");
+notation is ambiguous for some king captures, where the int must be used.
+ai_move takes a searcher configuration as in experiments/match.py and a time
+budget in seconds, which includes the time the request waits for a worker.
+
+A state is {"game", "ply", "turn", "fen", "board", "legal_moves", "result",
+"draw_reason"}. board has one character per square 1-50: "." empty, "r"/"R"
+red man/king, "b"/"B" blue man/king. result is null, "red", "blue" or "draw".
+"""
+import json
+from checkers.constants import RED, BLUE
+from checkers.moves import move_to_str
+from checkers.snapshot import Snapshot
+from checkers.position import to_fen
+
+MAX_LINE_BYTES = 64 * 1024
+
+COLOR_NAMES = {RED: 'red', BLUE: 'blue'}
+COLORS = {name: color for color, name in COLOR_NAMES.items()}
+_SQUARE_CHARS = '.rRbB'  # Indexed by the Snapshot square codes
+
+
+class ProtocolError(ValueError):
+    """A request the server cannot serve; its message is sent back as the error."""
+    def __init__(self, message, retry=False):
+        super().__init__(message)
+        self.retry = retry
+
+
+def decode(line):
+    try:
+        request = json.loads(line)
+    except ValueError:
+        raise ProtocolError('malformed JSON')
+    if not isinstance(request, dict) or not isinstance(request.get('op'), str):
+        raise ProtocolError('a request is a JSON object with an "op"')
+    return request
+
+
+def encode(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+def error(request_id, exc):
+    message = {'id': request_id, 'ok': False, 'error': str(exc)}
+    if getattr(exc, 'retry', False):
+        message['retry'] = True
+    return message
+
+
+def parse_move(value, legal_moves):
+    """The legal move named by value (an encoded int or notation)."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        if value in legal_moves:
+            return value
+    elif isinstance(value, str):
+        matches = [move for move in legal_moves if move_to_str(move) == value]
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ProtocolError(f'ambiguous move {value!r}; send the encoded move instead')
+    raise ProtocolError(f'illegal move {value!r}')
+
+
+def state_message(game_id, board, turn, ply):
+    snapshot = Snapshot.from_board(board, turn, ply=ply)
+    winner = board.get_winner()
+    draw_reason = board.draw_reason() if winner is None else None
+    return {
+        'game': game_id,
+        'ply': ply,
+        'turn': COLOR_NAMES[turn],
+        'fen': to_fen(board, turn),
+        'board': ''.join(_SQUARE_CHARS[code] for code in snapshot.squares),
+        'legal_moves': [{'move': move, 'notation': move_to_str(move)} for move in snapshot.legal_moves]
+                       if winner is None and draw_reason is None else [],
+        'result': COLOR_NAMES[winner] if winner is not None else ('draw' if draw_reason else None),
+        'draw_reason': draw_reason,
+    }
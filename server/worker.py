@@ -0,0 +1,51 @@
+"""Search jobs run in the server's process pool.
+
+A job carries the game as a binary position (checkers/position.py) plus the
+moves played since, so workers need no shared state besides the cancel
+flags: one byte per job slot in shared memory, set by the server when the
+client that asked for the move goes away.
+"""
+import time
+from checkers.constants import RED, BLUE
+from checkers.position import from_bytes
+from experiments.match import make_searcher
+from mcts.stepper import SearchStepper
+
+SLICE_ITERATIONS = 8  # Iterations between checks of the cancel flag
+MIN_TIME_LIMIT = 0.01  # Search time left to a job that waited in the queue for its whole budget
+
+_cancel_flags = None
+
+
+def init_worker(cancel_flags):
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+def replay(position, moves):
+    """(board, side to move) after playing moves from a binary position."""
+    board, turn = from_bytes(position)
+    for move in moves:
+        board.make_move(move)
+        turn = BLUE if turn == RED else RED
+    return board, turn
+
+
+def search_move(slot, position, moves, config, deadline):
+    """Search the position after playing moves from position; returns (move, search stats).
+
+    deadline is a time.time() value, so time spent waiting in the queue comes out
+    of the request's budget. A cancelled job returns its best move so far.
+    """
+    board, turn = replay(position, moves)
+    searcher = make_searcher(config, board, turn)
+    if deadline is not None:
+        if 'iterations' not in config:
+            searcher.iterations = 10 ** 9  # The time budget is the only limit
+        searcher.time_limit = max(deadline - time.time(), MIN_TIME_LIMIT)
+    stepper = SearchStepper(searcher)
+    while not stepper.step(SLICE_ITERATIONS):
+        if _cancel_flags[slot]:
+            stepper.cancel()
+            break
+    return stepper.best_move(), searcher.last_search_stats